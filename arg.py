@@ -1,24 +1,13 @@
 import os
-import json
 import uuid
-import calendar
 from datetime import datetime
 from openpyxl import load_workbook
+from manifest_writer import write_manifest
+from date_utils import format_iso_date
 import argparse
 import sys
 import shlex
 
-def format_iso_date(excel_date):
-    try:
-        if isinstance(excel_date, str):
-            if len(excel_date) == 7:
-                year, month = excel_date.split('-')
-                last_day = calendar.monthrange(int(year), int(month))[1]
-                excel_date = f"{year}-{month}-{last_day}"
-            return datetime.strptime(excel_date, "%Y-%m-%d").isoformat() + "-05:00"
-    except (ValueError, TypeError):
-        return None
-
 def get_file_tag(file_name):
     ext = os.path.splitext(file_name)[1]
     if not ext:
@@ -28,10 +17,7 @@ def get_file_tag(file_name):
     return ext
 
 def write_records_to_file(output_file_path, records):
-    upload_count = sum(1 for record in records if record['operation'] == 'upload_new_file')
-    with open(output_file_path, 'w') as json_file:
-        for record in records:
-            json_file.write(json.dumps(record, separators=(',', ':')) + '\n')
+    upload_count = len(write_manifest(output_file_path, records))
     print(f"Created manifest file: {os.path.basename(output_file_path)}")
     print(f"  → Contains {upload_count} upload_new_file operations")
     return upload_count
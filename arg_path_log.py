@@ -1,15 +1,417 @@
 import os
 import json
 import uuid
-import calendar
 from datetime import datetime
 from openpyxl import load_workbook
+from manifest_writer import ManifestBatch, encode_json, encode_lines, write_atomic
+from sheet_layout import BUILTIN_LAYOUTS, load_layout
+from columnar_reader import ColumnarSheet, ColumnarWorkbook
+from workbook_cache import WorkbookCache
 import argparse
 import sys
 import shlex
 import logging
+import logging.handlers
+import queue
+import atexit
 import hashlib
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import glob
+import time
+import sqlite3
+import cProfile
+from contextlib import contextmanager
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# Digests accepted for the dedup check; xxh3 needs the optional xxhash package
+HASH_ALGORITHMS = ('sha256', 'blake2b', 'xxh3')
+
+
+class ConversionError(Exception):
+    """Raised when a workbook cannot be converted"""
+
+
+# One listener per process writes log records for every processor, off the conversion thread
+_log_queue = None
+_log_listener = None
+_log_listener_pid = None
+
+
+def _start_log_listener(logger, log_file, formatter):
+    """Route the logger through a QueueHandler to a background file/console listener"""
+    global _log_queue, _log_listener, _log_listener_pid
+    if _log_listener is not None and _log_listener_pid == os.getpid():
+        return
+    # A forked pool worker inherits the parent's QueueHandler but not its listener thread
+    for handler in list(logger.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            logger.removeHandler(handler)
+    if logger.handlers:
+        # Configured by the embedding application
+        return
+
+    file_handler = logging.FileHandler(log_file, mode='a')
+    file_handler.setFormatter(formatter)
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+
+    _log_queue = queue.Queue()
+    _log_listener = logging.handlers.QueueListener(_log_queue, file_handler, console_handler)
+    _log_listener.start()
+    _log_listener_pid = os.getpid()
+    logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+    atexit.register(_log_listener.stop)
+
+
+def flush_logging():
+    """Block until every queued log record of this process has been written"""
+    if _log_queue is not None and _log_listener_pid == os.getpid():
+        _log_queue.join()
+
+
+class ProgressReporter:
+    """Rate-limited progress updates for the rows of one sheet.
+
+    The conversion loop compares its per-row timestamp with next_report
+    and only calls report() once an interval has passed, so a sheet logs
+    a handful of lines with rows/sec and an ETA instead of one line per
+    few rows.
+    """
+
+    def __init__(self, logger, sheet_name, expected_rows=None, interval=5.0):
+        self.logger = logger
+        self.sheet_name = sheet_name
+        self.expected_rows = expected_rows
+        self.interval = interval
+        self.start = time.perf_counter()
+        # No updates at all with a zero or negative interval
+        self.next_report = self.start + interval if interval > 0 else float('inf')
+
+    def report(self, row_count, now):
+        self.next_report = now + self.interval
+        elapsed = now - self.start
+        rate = row_count / elapsed if elapsed else 0.0
+        message = f"  Sheet {self.sheet_name}: {row_count} rows"
+        if self.expected_rows:
+            message += f" of ~{self.expected_rows} ({min(row_count / self.expected_rows, 1):.0%})"
+        message += f", {rate:.0f} rows/s"
+        if self.expected_rows and rate:
+            message += f", ETA {max(self.expected_rows - row_count, 0) / rate:.0f}s"
+        self.logger.info(message)
+
+    def finish(self, row_count):
+        elapsed = time.perf_counter() - self.start
+        rate = row_count / elapsed if elapsed else 0.0
+        self.logger.info(f"  Sheet {self.sheet_name}: {row_count} rows in {elapsed:.2f}s ({rate:.0f} rows/s)")
+
+
+class ConversionRegistry:
+    """Indexed record of converted workbooks, keyed by (file path, file hash).
+
+    Backed by SQLite in WAL mode so lookups use the primary key index no
+    matter how long the history gets, and several converters can record
+    conversions at the same time. Entries from the old CSV registry are
+    imported the first time the database is opened.
+    """
+
+    def __init__(self, db_path, legacy_path=None):
+        self.db_path = db_path
+        self.legacy_path = legacy_path
+        self.conn = sqlite3.connect(db_path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS conversions (
+                file_path TEXT NOT NULL,
+                file_hash TEXT NOT NULL,
+                converted_at TEXT NOT NULL,
+                file_size INTEGER,
+                file_mtime_ns INTEGER,
+                file_inode INTEGER,
+                PRIMARY KEY (file_path, file_hash)
+            )
+            """
+        )
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS row_fingerprints (
+                file_path TEXT NOT NULL,
+                sheet_name TEXT NOT NULL,
+                row_key TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                relation_id TEXT NOT NULL,
+                PRIMARY KEY (file_path, sheet_name, row_key)
+            )
+            """
+        )
+        # Databases created before stat tracking lack the stat columns
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(conversions)")}
+        for column in ('file_size', 'file_mtime_ns', 'file_inode'):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE conversions ADD COLUMN {column} INTEGER")
+        self.conn.commit()
+        if legacy_path and os.path.exists(legacy_path):
+            self._migrate_legacy_registry()
+
+    def _migrate_legacy_registry(self):
+        """Import the line-based CSV registry, then move it out of the way"""
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            if not os.path.exists(self.legacy_path):
+                # Another converter finished the migration while we waited for the lock
+                return
+            entries = []
+            with open(self.legacy_path, 'r') as f:
+                for line in f:
+                    try:
+                        file_path, hash_value, timestamp = line.strip().rsplit(',', 2)
+                    except ValueError:
+                        continue
+                    entries.append((file_path, hash_value, timestamp))
+            # Keep the earliest timestamp, as the linear scan reported the first match
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO conversions (file_path, file_hash, converted_at) VALUES (?, ?, ?)",
+                entries
+            )
+            os.replace(self.legacy_path, self.legacy_path + '.migrated')
+
+    def lookup(self, file_path, file_hash):
+        """Return the timestamp of a previous conversion, or None"""
+        row = self.conn.execute(
+            "SELECT converted_at FROM conversions WHERE file_path = ? AND file_hash = ?",
+            (file_path, file_hash)
+        ).fetchone()
+        return row[0] if row else None
+
+    def lookup_stat(self, file_path, file_stat):
+        """Return the timestamp of a conversion of this exact (size, mtime, inode), or None"""
+        row = self.conn.execute(
+            "SELECT converted_at FROM conversions "
+            "WHERE file_path = ? AND file_size = ? AND file_mtime_ns = ? AND file_inode = ?",
+            (file_path, file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino)
+        ).fetchone()
+        return row[0] if row else None
+
+    def record(self, file_path, file_hash, timestamp, file_stat=None):
+        stat_values = (None, None, None)
+        if file_stat is not None:
+            stat_values = (file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO conversions "
+                "(file_path, file_hash, converted_at, file_size, file_mtime_ns, file_inode) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (file_path, file_hash, timestamp) + stat_values
+            )
+
+    def load_row_fingerprints(self, file_path, sheet_name):
+        """Return {row_key: (fingerprint, relation_id)} stored for a sheet by the last incremental run"""
+        rows = self.conn.execute(
+            "SELECT row_key, fingerprint, relation_id FROM row_fingerprints "
+            "WHERE file_path = ? AND sheet_name = ?",
+            (file_path, sheet_name)
+        )
+        return {row_key: (fingerprint, relation_id) for row_key, fingerprint, relation_id in rows}
+
+    def replace_row_fingerprints(self, file_path, sheet_fingerprints):
+        """Replace the stored fingerprints of a workbook with {sheet_name: [(row_key, fingerprint, relation_id)]}"""
+        with self.conn:
+            self.conn.execute("DELETE FROM row_fingerprints WHERE file_path = ?", (file_path,))
+            for sheet_name, entries in sheet_fingerprints.items():
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO row_fingerprints "
+                    "(file_path, sheet_name, row_key, fingerprint, relation_id) VALUES (?, ?, ?, ?, ?)",
+                    ((file_path, sheet_name) + entry for entry in entries)
+                )
+
+    def close(self):
+        self.conn.close()
+
+
+class StageTimer:
+    """Wall time spent in each conversion stage, plus row and file counters.
+
+    Row-level stages are timed with two perf_counter calls per row, cheap
+    enough to stay on for every run. Timers from parallel workers are
+    merged, so their stage times add up to more than the wall time.
+    """
+
+    STAGES = (
+        'load', 'header', 'row_extract', 'record_build', 'serialize',
+        'write', 'publish', 'hash', 'registry'
+    )
+    COUNTERS = ('sheets', 'rows', 'rows_skipped', 'manifest_files', 'bytes_written')
+
+    def __init__(self):
+        self.seconds = dict.fromkeys(self.STAGES, 0.0)
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - start
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    def snapshot(self):
+        return {'seconds': dict(self.seconds), 'counters': dict(self.counters)}
+
+    def merge(self, snapshot):
+        for name, seconds in snapshot['seconds'].items():
+            self.seconds[name] += seconds
+        for name, amount in snapshot['counters'].items():
+            self.counters[name] += amount
+
+
+class RowFingerprints:
+    """Classify the rows of one sheet against the fingerprints of the previous run.
+
+    Rows are keyed by source folder and file name (plus an occurrence count
+    for repeated names), so inserted or reordered rows leave the keys of the
+    others alone. The fingerprint covers every extracted value and the sheet
+    header that feeds each record. Changed rows keep the relation_id they
+    were first emitted with.
+    """
+
+    def __init__(self, previous, header, layout_name):
+        self.previous = previous
+        self.entries = []
+        self.occurrences = {}
+        self.counts = {'added': 0, 'changed': 0, 'unchanged': 0}
+        # Hashed once; each row hash continues from a copy of this state
+        self._header_hasher = hashlib.blake2b(
+            repr((layout_name, sorted(header.items()))).encode('utf-8', 'surrogatepass'),
+            digest_size=16
+        )
+
+    def classify(self, row):
+        """Return the relation_id to emit the row with, or None if it is unchanged"""
+        base_key = f"{row[1]}/{row[0]}"
+        occurrence = self.occurrences.get(base_key, 0)
+        self.occurrences[base_key] = occurrence + 1
+        row_key = f"{base_key}#{occurrence}"
+
+        hasher = self._header_hasher.copy()
+        hasher.update(repr(row).encode('utf-8', 'surrogatepass'))
+        fingerprint = hasher.hexdigest()
+
+        previous = self.previous.get(row_key)
+        if previous is None:
+            status = 'added'
+            relation_id = str(uuid.uuid4())
+        else:
+            previous_fingerprint, relation_id = previous
+            status = 'unchanged' if previous_fingerprint == fingerprint else 'changed'
+        self.counts[status] += 1
+        self.entries.append((row_key, fingerprint, relation_id))
+        return None if status == 'unchanged' else relation_id
+
+    def summary(self):
+        """Row counts by status, including rows of the previous run that are gone"""
+        current_keys = {entry[0] for entry in self.entries}
+        removed = sum(1 for row_key in self.previous if row_key not in current_keys)
+        return dict(self.counts, removed=removed)
+
+
+class RecordTemplate:
+    """Manifest lines for one sheet, with the sheet-constant fields serialized once.
+
+    render() JSON-encodes only the per-row values and splices them into
+    %-format strings, so the row loop builds no dicts. The lines match
+    json.dumps(record, separators=(',', ':')) for the equivalent records.
+    """
+
+    SECURITY_CLASSIFICATION_MAP = {
+        "Confidential": "C",
+        "Highly Confidential": "HC",
+        "Internal": "I",
+        "Public": "P"
+    }
+
+    def __init__(self, header, submission_date, layout):
+        publisher = header['publisher']
+        region = header['region']
+        record_class = header['record_class']
+        provenance = header['provenance']
+        security_classification = self.SECURITY_CLASSIFICATION_MAP.get(header['security_classification'], "I")
+        creator = header['creator']
+        contributor = header['contributor']
+        cost_center = layout.cost_center(header['cost_center'])
+
+        self.format_iso_date = layout.record_date
+        self.get_file_tag = layout.file_tag
+        self.folder_prefix = f"/dropzone/a360root/{publisher.lower()}/submission/"
+
+        def constant(value):
+            # Serialized once; '%' is escaped because the result becomes a format string
+            return encode_json(value).replace('%', '%%')
+
+        self.create_format = (
+            '{"operation":"create_record","relation_id":%s,"record_metadata":{'
+            '"record_class":' + constant(record_class) +
+            ',"publisher":' + constant(publisher) +
+            ',"region":' + constant(region) +
+            ',"recorddate":%s'
+            ',"provenance":' + constant(provenance) +
+            ',"submission_date":' + constant(submission_date) +
+            ',"security_classification":' + constant(security_classification) +
+            ',"contributor":' + constant(contributor) +
+            ',"creator":' + constant(creator) +
+            ',"description":%s,"title":%s,"language":"eng"'
+            ',"cost_center":' + constant(cost_center) +
+            ',"date_range":%s,"major_description":%s,"minor_description":%s,"reference_1":%s}}'
+        )
+        self.upload_format = (
+            '{"operation":"upload_new_file","relation_id":%s,"file_metadata":{'
+            '"publisher":' + constant(publisher) +
+            ',"source_folder_path":%s,"source_file_name":%s,"dz_folder_path":%s'
+            ',"dz_file_name":%s,"file_tag":%s}}'
+        )
+
+    def render(self, row, relation_id=None, prepared=None):
+        """Return (create_record line, upload_new_file line, dz_file_name) for a data row.
+
+        prepared is the row's (record date, file tag) when a columnar reader
+        already computed them.
+        """
+        file_name = row[0]
+        file_path = row[1]
+        if prepared is None:
+            record_date = self.format_iso_date(row[3])
+            file_tag = self.get_file_tag(file_name)
+        else:
+            record_date, file_tag = prepared
+        relation_id = '"%s"' % (relation_id or uuid.uuid4())
+        encoded_name = encode_json(file_name)
+        create_line = self.create_format % (
+            relation_id,
+            encode_json(record_date),
+            encode_json(row[4]),
+            encoded_name,
+            encode_json(row[5]),
+            encode_json(row[6]),
+            encode_json(row[7]),
+            encode_json(row[8])
+        )
+        upload_line = self.upload_format % (
+            relation_id,
+            encode_json(file_path),
+            encoded_name,
+            encode_json(f"{self.folder_prefix}{file_path}/"),
+            encoded_name,
+            encode_json(file_tag)
+        )
+        return create_line, upload_line, file_name
+
 
 class ExcelProcessor:
     # Fixed paths relative to script location
@@ -17,24 +419,68 @@ class ExcelProcessor:
     LOG_DIR = os.path.join(SCRIPT_DIR, '.logs')
     LOG_FILE = os.path.join(LOG_DIR, 'conversion_history.log')
     HISTORY_FILE = os.path.join(LOG_DIR, '.conversion_registry')
+    REGISTRY_DB = os.path.join(LOG_DIR, 'conversion_registry.db')
+    CACHE_DIR = os.path.join(LOG_DIR, 'workbook_cache')
+    CACHE_MAX_BYTES = 1024 * 1024 * 1024
+
+    RECORDS_PER_FILE = 100
+    HASH_CHUNK_SIZE = 1024 * 1024
 
-    def __init__(self, input_file, output_directory, force=False):
+    def __init__(self, input_file, output_directory, force=False, streaming=False,
+                 workers=1, hash_algorithm='sha256',
+                 records_per_file=RECORDS_PER_FILE, max_file_bytes=None, file_per_sheet=False,
+                 layout='default', incremental=False, sync_manifests=True,
+                 write_stats=False, profile=False, progress_interval=5.0, upload_list=False,
+                 reader='openpyxl', cache=False, cache_max_bytes=CACHE_MAX_BYTES):
         self.input_file = os.path.abspath(input_file)
         self.output_directory = os.path.abspath(output_directory)
         self.force = force
+        self.streaming = streaming
+        self.workers = workers
+        self.hash_algorithm = hash_algorithm
+        # Manifest chunking: a new file starts when either limit would be exceeded
+        self.records_per_file = None if file_per_sheet else records_per_file
+        self.max_file_bytes = None if file_per_sheet else max_file_bytes
+        self.file_per_sheet = file_per_sheet
+        # Header cells, data columns and transforms of this workbook variant
+        self.layout = load_layout(layout)
+        # 'openpyxl' iterates cells; 'pandas' parses each sheet into a DataFrame in one read
+        self.reader = reader
+        # Parsed sheets are kept as Arrow files in CACHE_DIR and reused by later runs
+        self.cache = cache
+        self.cache_max_bytes = cache_max_bytes
+        self._workbook_cache = None
+        # Only emit rows added or changed since the previous incremental run
+        self.incremental = incremental
+        self._row_fingerprints = {}
+        self._run_started = datetime.now()
+        # Manifests are staged and published once per workbook; see ManifestBatch
+        self.sync_manifests = sync_manifests
+        self._manifest_batch = None
+        # Stage timings go to the log; --stats also writes them to <base>.stats.json
+        self.timer = StageTimer()
+        self.write_stats = write_stats
+        self.profile = profile
+        self.progress_interval = progress_interval
+        # (manifest name, dz_file_names) per manifest, written to <base>.uploads.tsv if requested
+        self.upload_list = upload_list
+        self._uploads_by_manifest = []
+        self._registry = None
+        self._file_hash = None
+        self._file_stat = None
         self._ensure_log_directory()
         self.setup_logging()
         
     def _ensure_log_directory(self):
-        """Ensure log directory exists and is hidden"""
+        """Ensure log directory exists (hidden by its dot prefix)"""
+        # No chattr +i here: SQLite creates its journal files next to the registry
         os.makedirs(self.LOG_DIR, exist_ok=True)
-        # Make directory hidden on Unix systems
-        if os.name == 'posix':
-            try:
-                import subprocess
-                subprocess.run(['chattr', '+i', self.LOG_DIR], check=False)
-            except:
-                pass
+
+    @property
+    def registry(self):
+        if self._registry is None:
+            self._registry = ConversionRegistry(self.REGISTRY_DB, self.HISTORY_FILE)
+        return self._registry
 
     def setup_logging(self):
         formatter = logging.Formatter(
@@ -42,238 +488,727 @@ class ExcelProcessor:
             datefmt='%Y-%m-%d %H:%M:%S'
         )
         
-        # Setup file handler
-        self.file_handler = logging.FileHandler(self.LOG_FILE, mode='a')
-        self.file_handler.setFormatter(formatter)
-        
-        # Setup console handler
-        self.console_handler = logging.StreamHandler()
-        self.console_handler.setFormatter(formatter)
-        
         # Setup logger with custom adapter for input file context
         logger = logging.getLogger('ExcelConverter')
         logger.setLevel(logging.INFO)
-        logger.addHandler(self.file_handler)
-        logger.addHandler(self.console_handler)
+        # Records are written by the listener's handlers only, not again (synchronously) by root's
+        logger.propagate = False
+
+        # File and console handlers run on a listener thread shared by every processor in this process
+        _start_log_listener(logger, self.LOG_FILE, formatter)
         
         # Create adapter to include input file in all log messages
         self.logger = logging.LoggerAdapter(logger, {'input_file': os.path.basename(self.input_file)})
 
+    def _new_hasher(self):
+        if self.hash_algorithm == 'sha256':
+            return hashlib.sha256()
+        if self.hash_algorithm == 'blake2b':
+            return hashlib.blake2b()
+        if self.hash_algorithm == 'xxh3':
+            if xxhash is None:
+                raise ConversionError("The xxh3 digest requires the xxhash package")
+            return xxhash.xxh3_128()
+        raise ConversionError(f"Unknown hash algorithm: {self.hash_algorithm}")
+
     def get_file_hash(self):
-        """Calculate SHA-256 hash of input file"""
-        hasher = hashlib.sha256()
-        with open(self.input_file, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b''):
-                hasher.update(chunk)
-        return hasher.hexdigest()
+        """Calculate the digest of the input file (once per run)"""
+        if self._file_hash is None:
+            hasher = self._new_hasher()
+            buffer = bytearray(self.HASH_CHUNK_SIZE)
+            view = memoryview(buffer)
+            with self.timer.stage('hash'), open(self.input_file, 'rb', buffering=0) as f:
+                while True:
+                    size = f.readinto(buffer)
+                    if not size:
+                        break
+                    hasher.update(view[:size])
+            # SHA-256 digests stay bare so entries from older runs keep matching
+            if self.hash_algorithm == 'sha256':
+                self._file_hash = hasher.hexdigest()
+            else:
+                self._file_hash = f"{self.hash_algorithm}:{hasher.hexdigest()}"
+        return self._file_hash
 
     def check_previous_conversion(self):
         """Check if file was previously converted"""
-        current_hash = self.get_file_hash()
-        
-        if os.path.exists(self.HISTORY_FILE):
-            with open(self.HISTORY_FILE, 'r') as f:
-                for line in f:
-                    try:
-                        file_path, hash_value, timestamp = line.strip().split(',')
-                        if file_path == self.input_file and hash_value == current_hash:
-                            if not self.force:
-                                self.logger.warning(
-                                    f"File was already converted on {timestamp}. "
-                                    "Use --force to convert again."
-                                )
-                                return True
-                    except ValueError:
-                        continue
+        # Stat before hashing so a file modified mid-run is re-hashed next time
+        self._file_stat = os.stat(self.input_file)
+        if self.force:
+            return False
+
+        with self.timer.stage('registry'):
+            timestamp = self.registry.lookup_stat(self.input_file, self._file_stat)
+        if timestamp is None:
+            file_hash = self.get_file_hash()
+            with self.timer.stage('registry'):
+                timestamp = self.registry.lookup(self.input_file, file_hash)
+        if timestamp:
+            self.logger.warning(
+                f"File was already converted on {timestamp}. "
+                "Use --force to convert again."
+            )
+            return True
         return False
 
     def record_conversion(self):
         """Record successful conversion with timestamp"""
         current_hash = self.get_file_hash()
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        with open(self.HISTORY_FILE, 'a') as f:
-            f.write(f"{self.input_file},{current_hash},{timestamp}\n")
+
+        with self.timer.stage('registry'):
+            if self.incremental:
+                self.registry.replace_row_fingerprints(self.input_file, self._row_fingerprints)
+            self.registry.record(self.input_file, current_hash, timestamp, self._file_stat)
 
     def format_iso_date(self, excel_date):
-        try:
-            if isinstance(excel_date, str):
-                if len(excel_date) == 7:
-                    year, month = excel_date.split('-')
-                    last_day = calendar.monthrange(int(year), int(month))[1]
-                    excel_date = f"{year}-{month}-{last_day}"
-                return datetime.strptime(excel_date, "%Y-%m-%d").isoformat() + "-05:00"
-        except (ValueError, TypeError):
-            return None
+        return self.layout.record_date(excel_date)
 
     def get_file_tag(self, file_name):
-        ext = os.path.splitext(file_name)[1]
-        if not ext:
-            ext = file_name.split(".")[-1]
-        else:
-            ext = ext[1:]
-        return ext
-
-    def write_records_to_file(self, output_file_path, records, sheet_name):
-        upload_count = sum(1 for record in records if record['operation'] == 'upload_new_file')
-        with open(output_file_path, 'w') as json_file:
-            for record in records:
-                json_file.write(json.dumps(record, separators=(',', ':')) + '\n')
-        
-        self.logger.info(f"Created manifest file: {os.path.basename(output_file_path)}")
-        self.logger.info(f"  → Contains {upload_count} upload_new_file operations")
-        
-        # Log upload files for this sheet
-        upload_files = [
-            record['file_metadata']['dz_file_name']
-            for record in records
-            if record['operation'] == 'upload_new_file'
-        ]
-        self.logger.info(f"Upload files created for sheet {sheet_name}:")
-        for file in upload_files:
-            self.logger.info(f"  → {file}")
+        return self.layout.file_tag(file_name)
+
+    def write_records_to_file(self, output_file_path, lines, upload_files, sheet_name):
+        with self.timer.stage('serialize'):
+            data = encode_lines(lines)
+        with self.timer.stage('write'):
+            if self._manifest_batch is not None:
+                self._manifest_batch.write(output_file_path, data)
+            else:
+                write_atomic(output_file_path, data)
+        self.timer.count('manifest_files')
+        self.timer.count('bytes_written', len(data))
+        upload_count = len(upload_files)
+
+        # One line per manifest; the file names themselves go to the optional upload list
+        self.logger.debug(
+            f"Created manifest file: {os.path.basename(output_file_path)} "
+            f"({upload_count} upload_new_file operations, sheet {sheet_name})"
+        )
+        if self.upload_list:
+            self._uploads_by_manifest.append((os.path.basename(output_file_path), upload_files))
         
         return upload_count
 
+    def write_upload_list(self, uploads_by_manifest):
+        """Write <base>.uploads.tsv: one manifest name and dz_file_name per line"""
+        upload_list_path = os.path.join(self.output_directory, f"{self.manifest_base_name()}.uploads.tsv")
+        lines = [
+            f"{manifest_name}\t{dz_file_name}"
+            for manifest_name, upload_files in uploads_by_manifest
+            for dz_file_name in upload_files
+        ]
+        write_atomic(upload_list_path, ''.join(line + '\n' for line in lines).encode('utf-8'))
+        self.logger.info(f"Upload list written to {upload_list_path}")
+
+    def open_workbook(self):
+        """Open the input workbook, in read-only (streaming) mode if requested.
+
+        Read-only mode parses each sheet lazily with iterparse instead of
+        building the full cell graph, so memory stays bounded by the rows
+        held in the current output chunk. The pandas reader returns a
+        ColumnarWorkbook whose sheets are parsed when first accessed.
+        With the cache enabled, sheets come from Arrow copies of an earlier
+        run of the same file and reader; the workbook itself is only opened
+        for sheets that are not cached yet.
+        """
+        if self.cache:
+            key = f"{self.get_file_hash()}-{self.reader}"
+            with self.timer.stage('load'):
+                if self._workbook_cache is None:
+                    self._workbook_cache = WorkbookCache(self.CACHE_DIR, self.cache_max_bytes)
+                return self._workbook_cache.open(key, self._load_workbook)
+        with self.timer.stage('load'):
+            return self._load_workbook()
+
+    def _load_workbook(self):
+        if self.reader == 'pandas':
+            return ColumnarWorkbook(self.input_file)
+        return load_workbook(self.input_file, data_only=True, read_only=self.streaming)
+
+    def get_sheet(self, wb, sheet_name):
+        with self.timer.stage('load'):
+            return wb[sheet_name]
+
+    def read_sheet_header(self, sheet):
+        """Read the layout's header cells from the top rows of a sheet in one pass"""
+        with self.timer.stage('header'):
+            header_rows = list(sheet.iter_rows(
+                min_row=1,
+                max_row=self.layout.header_max_row,
+                max_col=self.layout.header_max_col,
+                values_only=True
+            ))
+            return self.layout.read_header(header_rows)
+
+    def iter_data_rows(self, sheet):
+        """Yield data rows in ROW_FIELDS order until the first row without a file name"""
+        if isinstance(sheet, ColumnarSheet):
+            # Whole data region at once, with the record date and file tag columns precomputed
+            with self.timer.stage('row_extract'):
+                return sheet.data_rows(self.layout)
+        return self._iter_sheet_rows(sheet)
+
+    def _iter_sheet_rows(self, sheet):
+        extract_row = self.layout.extract_row
+        for row in sheet.iter_rows(
+            min_row=self.layout.data_start_row,
+            max_col=self.layout.data_max_col,
+            values_only=True
+        ):
+            if not row:
+                break
+            values = extract_row(row)
+            if values[0] is None:
+                break
+            yield values
+
     def process_excel_file(self):
+        """Convert the workbook; returns the rows read, or None if it was skipped"""
+        if not self.profile:
+            return self._process_excel_file()
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(self._process_excel_file)
+        finally:
+            profile_path = os.path.join(self.output_directory, f"{self.output_base_name()}.pstats")
+            profiler.dump_stats(profile_path)
+            self.logger.info(f"Profile written to {profile_path}")
+
+    def output_base_name(self):
+        return os.path.splitext(os.path.basename(self.input_file))[0]
+
+    def manifest_base_name(self):
+        """Prefix of this run's manifest names.
+
+        Incremental runs add _inc<run start>, so a delta never replaces the
+        manifests of an earlier run that may not have been ingested yet.
+        """
+        base_name = self.output_base_name()
+        if self.incremental:
+            return f"{base_name}_inc{self._run_started.strftime('%Y%m%d%H%M%S')}"
+        return base_name
+
+    def _process_excel_file(self):
         self.logger.info(f"\n=== Starting to process Excel file: {self.input_file} ===\n")
+        start = time.perf_counter()
         
         if self.check_previous_conversion():
             return
             
+        if self.workers > 1:
+            total_rows = self._process_workbook_parallel(self.workers)
+            self.record_conversion()
+            self.report_stats(time.perf_counter() - start)
+            return total_rows
+
         try:
-            wb = load_workbook(self.input_file, data_only=True)
+            wb = self.open_workbook()
         except Exception as e:
             self.logger.error(f"Error loading workbook: {e}")
-            sys.exit(1)
-        
-        excel_base_name = os.path.splitext(os.path.basename(self.input_file))[0]
+            raise ConversionError(f"Error loading workbook: {e}") from e
+
+        # Consumers see this workbook's manifests only once all of them are written
+        batch = ManifestBatch(durable=self.sync_manifests)
+        self._manifest_batch = batch
+        try:
+            total_rows = self._process_workbook(wb)
+        except BaseException:
+            batch.abort()
+            raise
+        finally:
+            self._manifest_batch = None
+            # Read-only workbooks keep the archive open until closed
+            if self.streaming or self.reader == 'pandas' or self.cache:
+                wb.close()
+        with self.timer.stage('publish'):
+            published = batch.publish()
+        self.logger.info(f"Published {published} manifest file(s)")
+        if self.upload_list:
+            self.write_upload_list(self._uploads_by_manifest)
+        if self.cache:
+            self.trim_cache(wb)
+
+        # Record successful conversion
+        self.record_conversion()
+        self.report_stats(time.perf_counter() - start)
+        return total_rows
+
+    def trim_cache(self, wb):
+        """Report cache use for this workbook and evict old entries over the size limit"""
+        self.logger.info(f"Workbook cache: {wb.hits} sheet(s) reused, {wb.misses} parsed and stored")
+        freed = self._workbook_cache.evict(keep=wb.entry_directory)
+        if freed:
+            self.logger.info(f"Workbook cache: evicted {freed} bytes of least recently used entries")
+
+    def report_stats(self, total_seconds):
+        """Log the stage breakdown and optionally write it as <base>.stats.json"""
+        seconds = self.timer.seconds
+        counters = self.timer.counters
+        self.logger.info(f"Stage timings for {counters['rows']} rows in {total_seconds:.3f}s:")
+        for name in StageTimer.STAGES:
+            share = seconds[name] / total_seconds * 100 if total_seconds else 0.0
+            self.logger.info(f"  {name:<13}{seconds[name]:9.3f}s {share:5.1f}%")
+        self.logger.info(
+            "  " + ", ".join(f"{name}={amount}" for name, amount in counters.items())
+        )
+        if self.write_stats:
+            stats_path = os.path.join(self.output_directory, f"{self.output_base_name()}.stats.json")
+            stats = dict(
+                self.timer.snapshot(),
+                input_file=self.input_file,
+                total_seconds=total_seconds,
+                workers=self.workers,
+                streaming=self.streaming,
+            )
+            write_atomic(stats_path, json.dumps(stats, indent=4).encode('ascii'))
+            self.logger.info(f"Stats written to {stats_path}")
+
+    def _process_workbook(self, wb):
+        excel_base_name = self.manifest_base_name()
         file_count = 0
         total_upload_operations = 0
+        total_rows = 0
         
-        metadata_sheets = [sheet for sheet in wb.sheetnames if sheet.startswith("Metadata")]
-        if not metadata_sheets:
-            self.logger.error("No metadata sheets found in the workbook!")
-            sys.exit(1)
-
+        metadata_sheets = self.get_metadata_sheets(wb)
         self.logger.info(f"Found {len(metadata_sheets)} metadata sheet(s) to process\n")
 
         for sheet_name in metadata_sheets:
             self.logger.info(f"\nProcessing sheet: {sheet_name}")
-            sheet = wb[sheet_name]
-            current_records = []
-            records_per_file = 100
-            
-            publisher = sheet['B1'].value
-            region = sheet['R4'].value
-            record_class = sheet['C9'].value
-            provenance = sheet['D1'].value
-            security_classification = sheet['D4'].value
-            
-            security_classification_map = {
-                "Confidential": "C",
-                "Highly Confidential": "HC",
-                "Internal": "I",
-                "Public": "P"
-            }
-            
-            security_classification = security_classification_map.get(security_classification, "I")
-            
-            creator = sheet['B2'].value
-            contributor = sheet['D2'].value
-            cost_center = str(sheet['B3'].value).zfill(12) if isinstance(sheet['B3'].value, (int, float)) else sheet['B3'].value.strip()
-
-            row_count = 0
-            for row in sheet.iter_rows(min_row=9, values_only=True):
-                if row[0] is None:
-                    break
-                    
-                row_count += 1
-                if row_count % 10 == 0:
-                    self.logger.info(f"  Processing row {row_count}...")
-                    
-                file_name = row[0]
-                file_path = row[1]
-                folder_path = f"/dropzone/a360root/{publisher.lower()}/submission/{file_path}/"
-                record_code = row[2]
-                record_date = row[3]
-                formatted_record_date = self.format_iso_date(record_date)
-                relation_id = str(uuid.uuid4())
-                submission_date = datetime.now().isoformat() + "-05:00"
-                
-                record_metadata = {
-                    "record_class": record_class,
-                    "publisher": publisher,
-                    "region": region,
-                    "recorddate": formatted_record_date,
-                    "provenance": provenance,
-                    "submission_date": submission_date,
-                    "security_classification": security_classification,
-                    "contributor": contributor,
-                    "creator": creator,
-                    "description": row[4],
-                    "title": file_name,
-                    "language": "eng",
-                    "cost_center": cost_center,
-                    "date_range": row[5],
-                    "major_description": row[6],
-                    "minor_description": row[7],
-                    "reference_1": row[8]
-                }
-                
-                file_metadata = {
-                    "publisher": publisher,
-                    "source_folder_path": file_path,
-                    "source_file_name": file_name,
-                    "dz_folder_path": folder_path,
-                    "dz_file_name": file_name,
-                    "file_tag": self.get_file_tag(file_name)
-                }
-                
-                current_records.append({
-                    "operation": "create_record",
-                    "relation_id": relation_id,
-                    "record_metadata": record_metadata
-                })
+            self.timer.count('sheets')
+            sheet = self.get_sheet(wb, sheet_name)
+            header = self.read_sheet_header(sheet)
+            first_file = file_count
+            # The dimension is only an estimate (and missing from some files); it feeds the ETA
+            expected_rows = None
+            if sheet.max_row and sheet.max_row >= self.layout.data_start_row:
+                expected_rows = sheet.max_row - self.layout.data_start_row + 1
+            stats = self.convert_rows(
+                sheet_name,
+                header,
+                self.iter_data_rows(sheet),
+                lambda idx: f"{excel_base_name}_{sheet_name}_{first_file + idx}.a360",
+                self.row_fingerprints(sheet_name, header),
+                expected_rows
+            )
+            if 'changes' in stats:
+                self.track_row_changes(sheet_name, stats)
+            total_rows += stats['rows']
+            total_upload_operations += stats['uploads']
+            file_count += stats['files']
                 
-                current_records.append({
-                    "operation": "upload_new_file",
-                    "relation_id": relation_id,
-                    "file_metadata": file_metadata
-                })
-                
-                if len(current_records) >= records_per_file * 2:
-                    output_file_path = os.path.join(
-                        self.output_directory, 
-                        f"{excel_base_name}_{sheet_name}_{file_count}.a360"
-                    )
-                    upload_count = self.write_records_to_file(output_file_path, current_records, sheet_name)
-                    total_upload_operations += upload_count
-                    current_records = []
-                    file_count += 1
-                    
-            if current_records:
-                output_file_path = os.path.join(
-                    self.output_directory,
-                    f"{excel_base_name}_{sheet_name}_{file_count}.a360"
+        self.logger.info(f"\n=== Processing Complete ===")
+        self.logger.info(f"Total manifest files created: {file_count}")
+        self.logger.info(f"Total upload_new_file operations: {total_upload_operations}")
+        return total_rows
+
+    def get_metadata_sheets(self, wb):
+        metadata_sheets = [sheet for sheet in wb.sheetnames if sheet.startswith(self.layout.sheet_prefix)]
+        if not metadata_sheets:
+            self.logger.error("No metadata sheets found in the workbook!")
+            raise ConversionError("No metadata sheets found in the workbook")
+        return metadata_sheets
+
+    def compile_record_template(self, header):
+        return RecordTemplate(header, datetime.now().isoformat() + "-05:00", self.layout)
+
+    def row_fingerprints(self, sheet_name, header):
+        """Fingerprints of the previous run for a sheet in incremental mode, else None"""
+        if not self.incremental:
+            return None
+        previous = self.registry.load_row_fingerprints(self.input_file, sheet_name)
+        return RowFingerprints(previous, header, self.layout.name)
+
+    def track_row_changes(self, sheet_name, stats):
+        """Keep a sheet's fingerprints for the registry and report what was skipped"""
+        self._row_fingerprints[sheet_name] = stats['fingerprints']
+        changes = stats['changes']
+        self.logger.info(
+            f"Incremental: sheet {sheet_name} has {changes['added']} added, "
+            f"{changes['changed']} changed and {changes['removed']} removed row(s); "
+            f"skipped {changes['unchanged']} unchanged row(s)"
+        )
+
+    def convert_rows(self, sheet_name, header, rows, output_name, fingerprints=None, expected_rows=None):
+        """Convert data rows of one sheet into manifest files.
+
+        output_name(idx) returns the file name of the idx-th manifest written
+        for these rows, so callers control the numbering scheme. With
+        fingerprints (a RowFingerprints), unchanged rows are skipped.
+        expected_rows, when known, adds a percentage and ETA to progress.
+        """
+        current_lines = []
+        current_uploads = []
+        current_bytes = 0
+        records_per_file = self.records_per_file
+        max_file_bytes = self.max_file_bytes
+        file_count = 0
+        total_upload_operations = 0
+        template = None
+
+        timer = self.timer
+        perf_counter = time.perf_counter
+        extract_seconds = 0.0
+        build_seconds = 0.0
+        skipped = 0
+        progress = ProgressReporter(self.logger, sheet_name, expected_rows, self.progress_interval)
+        # Record dates and file tags computed column-at-a-time by the pandas reader
+        prepared = getattr(rows, 'prepared', None)
+
+        row_count = 0
+        row_start = perf_counter()
+        for row in rows:
+            build_start = perf_counter()
+            extract_seconds += build_start - row_start
+            row_count += 1
+            if build_start >= progress.next_report:
+                progress.report(row_count, build_start)
+
+            relation_id = None
+            if fingerprints is not None:
+                relation_id = fingerprints.classify(row)
+                if relation_id is None:
+                    skipped += 1
+                    row_start = perf_counter()
+                    build_seconds += row_start - build_start
+                    continue
+
+            # Compiled on the first emitted row so sheets without data never touch the header values
+            if template is None:
+                template = self.compile_record_template(header)
+            create_line, upload_line, dz_file_name = template.render(
+                row, relation_id, None if prepared is None else prepared[row_count - 1]
+            )
+            row_start = perf_counter()
+            build_seconds += row_start - build_start
+            # Lines are ASCII, so their length is their size on disk (plus newlines)
+            row_bytes = len(create_line) + len(upload_line) + 2
+
+            # A row's two operations always land in the same manifest
+            if max_file_bytes and current_lines and current_bytes + row_bytes > max_file_bytes:
+                output_file_path = os.path.join(self.output_directory, output_name(file_count))
+                upload_count = self.write_records_to_file(
+                    output_file_path, current_lines, current_uploads, sheet_name
+                )
+                total_upload_operations += upload_count
+                current_lines = []
+                current_uploads = []
+                current_bytes = 0
+                file_count += 1
+                row_start = perf_counter()
+
+            current_lines.append(create_line)
+            current_lines.append(upload_line)
+            current_uploads.append(dz_file_name)
+            current_bytes += row_bytes
+            
+            if records_per_file and len(current_uploads) >= records_per_file:
+                output_file_path = os.path.join(self.output_directory, output_name(file_count))
+                upload_count = self.write_records_to_file(
+                    output_file_path, current_lines, current_uploads, sheet_name
                 )
-                upload_count = self.write_records_to_file(output_file_path, current_records, sheet_name)
                 total_upload_operations += upload_count
+                current_lines = []
+                current_uploads = []
+                current_bytes = 0
                 file_count += 1
+                # Writes are timed on their own; keep them out of the next row's extract time
+                row_start = perf_counter()
                 
+        # Time spent finding the end of the data
+        extract_seconds += perf_counter() - row_start
+
+        if current_lines:
+            output_file_path = os.path.join(self.output_directory, output_name(file_count))
+            upload_count = self.write_records_to_file(
+                output_file_path, current_lines, current_uploads, sheet_name
+            )
+            total_upload_operations += upload_count
+            file_count += 1
+
+        progress.finish(row_count)
+        timer.seconds['row_extract'] += extract_seconds
+        timer.seconds['record_build'] += build_seconds
+        timer.count('rows', row_count)
+        timer.count('rows_skipped', skipped)
+
+        stats = {'rows': row_count, 'files': file_count, 'uploads': total_upload_operations}
+        if fingerprints is not None:
+            stats['changes'] = fingerprints.summary()
+            stats['fingerprints'] = fingerprints.entries
+        return stats
+
+    def worker_options(self):
+        """Settings a sheet worker needs to produce the same manifests"""
+        return {
+            'records_per_file': self.records_per_file,
+            'max_file_bytes': self.max_file_bytes,
+            'file_per_sheet': self.file_per_sheet,
+            'layout': dict(self.layout.spec, name=self.layout.name),
+            'incremental': self.incremental,
+            'progress_interval': self.progress_interval,
+            'upload_list': self.upload_list,
+        }
+
+    def _remove_part_files(self, run_token):
+        """Delete every part file a parallel run wrote, including those of failed workers"""
+        excel_base_name = os.path.splitext(os.path.basename(self.input_file))[0]
+        pattern = _part_file_name(glob.escape(excel_base_name), '*', '*', run_token)
+        for part_file in glob.glob(os.path.join(glob.escape(self.output_directory), pattern)):
+            try:
+                os.remove(part_file)
+            except FileNotFoundError:
+                pass
+
+    def _process_workbook_parallel(self, workers):
+        """Convert metadata sheets in a process pool, one sheet per task.
+
+        Sheets are not split into row ranges: a read-only worksheet still
+        parses every row before min_row, so the later ranges of a sheet
+        re-parse most of it and splitting ends up slower than converting
+        the sheet in one task. Workers write their chunks under temporary
+        part names unique to this run; once every sheet is done they are
+        renamed in sheet order so the final numbering matches the serial
+        path exactly. If any sheet fails, every part file of the run is
+        removed.
+        """
+        excel_base_name = self.manifest_base_name()
+        run_token = f"{os.getpid()}.{uuid.uuid4().hex[:8]}"
+
+        try:
+            with self.timer.stage('load'):
+                wb = load_workbook(self.input_file, data_only=True, read_only=True)
+        except Exception as e:
+            self.logger.error(f"Error loading workbook: {e}")
+            raise ConversionError(f"Error loading workbook: {e}") from e
+        try:
+            metadata_sheets = self.get_metadata_sheets(wb)
+        finally:
+            wb.close()
+
+        self.logger.info(
+            f"Found {len(metadata_sheets)} metadata sheet(s) to process on {workers} worker(s)\n"
+        )
+
+        file_count = 0
+        sheet_stats = {}
+        uploads_by_manifest = []
+        # Part files are already temporary names; publish them under their final names in one batch
+        batch = ManifestBatch(durable=self.sync_manifests)
+        try:
+            # Leaving the pool waits for running workers, so every part file is on disk before cleanup
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(
+                        _convert_sheet,
+                        self.input_file, self.output_directory, self.worker_options(), sheet_name, run_token
+                    )
+                    for sheet_name in metadata_sheets
+                ]
+                try:
+                    results = [future.result() for future in futures]
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+
+            for sheet_name, result in zip(metadata_sheets, results):
+                part_uploads = dict(result['uploads_by_manifest'])
+                for part_file in result['part_files']:
+                    manifest_name = f"{excel_base_name}_{sheet_name}_{file_count}.a360"
+                    batch.stage(part_file, os.path.join(self.output_directory, manifest_name))
+                    if self.upload_list:
+                        uploads_by_manifest.append(
+                            (manifest_name, part_uploads[os.path.basename(part_file)])
+                        )
+                    file_count += 1
+                sheet_stats[sheet_name] = {
+                    'rows': result['rows'], 'files': result['files'], 'uploads': result['uploads']
+                }
+                self.timer.merge(result['timings'])
+                if 'changes' in result:
+                    self.track_row_changes(sheet_name, result)
+        except BaseException:
+            batch.abort()
+            self._remove_part_files(run_token)
+            raise
+        with self.timer.stage('publish'):
+            batch.publish()
+        self.timer.count('sheets', len(metadata_sheets))
+        if self.upload_list:
+            self.write_upload_list(uploads_by_manifest)
+
+        total_rows = sum(stats['rows'] for stats in sheet_stats.values())
+        total_upload_operations = sum(stats['uploads'] for stats in sheet_stats.values())
+
         self.logger.info(f"\n=== Processing Complete ===")
+        for sheet_name, stats in sheet_stats.items():
+            self.logger.info(
+                f"Sheet {sheet_name}: {stats['rows']} rows, {stats['files']} manifest files, "
+                f"{stats['uploads']} upload_new_file operations"
+            )
         self.logger.info(f"Total manifest files created: {file_count}")
         self.logger.info(f"Total upload_new_file operations: {total_upload_operations}")
-        
-        # Record successful conversion
-        self.record_conversion()
+        return total_rows
+
+
+def _part_file_name(excel_base_name, sheet_name, idx, run_token):
+    return f".{excel_base_name}_{sheet_name}_{idx}.{run_token}.a360.part"
+
+
+def _convert_sheet(input_file, output_directory, options, sheet_name, run_token):
+    """Process pool worker: convert one sheet into part files named with run_token"""
+    processor = ExcelProcessor(input_file, output_directory, force=True, streaming=True, **options)
+    excel_base_name = os.path.splitext(os.path.basename(input_file))[0]
+    part_names = []
+
+    def output_name(idx):
+        name = _part_file_name(excel_base_name, sheet_name, idx, run_token)
+        part_names.append(name)
+        return name
+
+    wb = processor.open_workbook()
+    try:
+        sheet = wb[sheet_name]
+        header = processor.read_sheet_header(sheet)
+        expected_rows = None
+        if sheet.max_row and sheet.max_row >= processor.layout.data_start_row:
+            expected_rows = sheet.max_row - processor.layout.data_start_row + 1
+        stats = processor.convert_rows(
+            sheet_name,
+            header,
+            processor.iter_data_rows(sheet),
+            output_name,
+            processor.row_fingerprints(sheet_name, header),
+            expected_rows
+        )
+    finally:
+        wb.close()
+        flush_logging()
+
+    stats['part_files'] = [os.path.join(processor.output_directory, name) for name in part_names]
+    stats['timings'] = processor.timer.snapshot()
+    stats['uploads_by_manifest'] = processor._uploads_by_manifest
+    return stats
+
+def collect_workbooks(input_path):
+    """Resolve a directory or glob pattern to .xlsx files, largest first.
+
+    Scheduling the biggest workbooks first keeps a worker pool from ending
+    the batch with one long conversion running alone.
+    """
+    if os.path.isdir(input_path):
+        pattern = os.path.join(input_path, '*.xlsx')
+    else:
+        pattern = input_path
+    workbooks = [path for path in glob.glob(pattern) if os.path.isfile(path)]
+    return sorted(workbooks, key=os.path.getsize, reverse=True)
+
+
+def _convert_workbook(input_file, output_directory, processor_options):
+    """Batch worker: convert one workbook, reporting failure instead of raising"""
+    start = time.perf_counter()
+    result = {'input_file': input_file, 'status': 'success', 'rows': 0, 'error': None}
+    try:
+        processor = ExcelProcessor(input_file, output_directory, **processor_options)
+        total_rows = processor.process_excel_file()
+        if total_rows is None:
+            result['status'] = 'skipped'
+        else:
+            result['rows'] = total_rows
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = str(e)
+    finally:
+        flush_logging()
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def run_batch(input_files, output_directory, jobs=None, **processor_options):
+    """Convert many workbooks across a process pool; one bad workbook fails alone.
+
+    processor_options are passed to ExcelProcessor for every workbook.
+    """
+    print(f"\n=== Batch conversion of {len(input_files)} workbook(s) ===\n")
+    batch_start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(
+                _convert_workbook, input_file, output_directory, processor_options
+            ): input_file
+            for input_file in input_files
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker process itself died (e.g. killed while parsing)
+                result = {
+                    'input_file': futures[future], 'status': 'failed',
+                    'rows': 0, 'error': str(e), 'seconds': 0.0
+                }
+            results.append(result)
+            line = (
+                f"{result['status']:>8}  {result['seconds']:8.2f}s  "
+                f"{result['rows']:>8} rows  {os.path.basename(result['input_file'])}"
+            )
+            if result['error']:
+                line += f"  ({result['error']})"
+            print(line)
+
+    failed = [result for result in results if result['status'] == 'failed']
+    print(f"\n=== Batch Complete in {time.perf_counter() - batch_start:.2f}s ===")
+    print(f"Converted: {sum(1 for result in results if result['status'] == 'success')}")
+    print(f"Skipped: {sum(1 for result in results if result['status'] == 'skipped')}")
+    print(f"Failed: {len(failed)}")
+    return results
+
 
 def main():
     parser = argparse.ArgumentParser(description="Convert Excel file to JSON format.")
-    parser.add_argument("input_file", type=str, help="Path to the Excel file")
+    parser.add_argument("input_file", type=str,
+                       help="Path to the Excel file, a directory of .xlsx files or a glob pattern")
     parser.add_argument("output_directory", type=str, help="Directory to save JSON files")
     parser.add_argument("--force", action="store_true", 
                        help="Force conversion even if file was previously converted")
+    parser.add_argument("--streaming", action="store_true",
+                       help="Stream rows from a read-only workbook to keep memory bounded on large sheets")
+    parser.add_argument("--workers", type=int, default=1,
+                       help="Convert metadata sheets in a pool of this many processes (workers always stream)")
+    parser.add_argument("--jobs", type=int, default=None,
+                       help="Number of workbooks converted concurrently in batch mode (default: CPU count)")
+    parser.add_argument("--hash-algorithm", choices=HASH_ALGORITHMS, default='sha256',
+                       help="Digest used for the previous-conversion check (xxh3 needs the xxhash package)")
+    parser.add_argument("--records-per-file", type=int, default=ExcelProcessor.RECORDS_PER_FILE,
+                       help="Maximum rows (record/upload pairs) per manifest file")
+    parser.add_argument("--max-file-bytes", type=int, default=None,
+                       help="Start a new manifest file before it would exceed this many bytes")
+    parser.add_argument("--file-per-sheet", action="store_true",
+                       help="Write one manifest file per sheet, ignoring the other limits")
+    parser.add_argument("--layout", type=str, default='default',
+                       help=f"Sheet layout: one of {', '.join(BUILTIN_LAYOUTS)} or a JSON layout file")
+    parser.add_argument("--incremental", action="store_true",
+                       help="Only write records for rows added or changed since the last incremental run, "
+                            "in manifests named <workbook>_inc<run start>_<sheet>_<n>.a360")
+    parser.add_argument("--no-sync", action="store_true",
+                       help="Publish manifests atomically but without flushing them to disk first")
+    parser.add_argument("--stats", action="store_true",
+                       help="Write per-stage timings and counters to <workbook>.stats.json in the output directory")
+    parser.add_argument("--profile", action="store_true",
+                       help="Run the conversion under cProfile and write <workbook>.pstats to the output directory")
+    parser.add_argument("--progress-interval", type=float, default=5.0,
+                       help="Seconds between progress updates for a sheet (0 disables them)")
+    parser.add_argument("--reader", choices=('openpyxl', 'pandas'), default='openpyxl',
+                       help="Read each sheet cell by cell (openpyxl) or into a DataFrame in one pass (pandas); "
+                            "parallel workers always use openpyxl")
+    parser.add_argument("--cache", action="store_true",
+                       help="Keep parsed sheets as Arrow files under .logs/workbook_cache and reuse them "
+                            "when the same workbook is converted again (needs pyarrow; not used by --workers)")
+    parser.add_argument("--cache-max-mb", type=int, default=ExcelProcessor.CACHE_MAX_BYTES // (1024 * 1024),
+                       help="Evict least recently used cache entries beyond this many MiB")
+    parser.add_argument("--upload-list", action="store_true",
+                       help="Write every manifest's dz_file_names to <workbook>.uploads.tsv instead of logging them")
     
     try:
         if len(sys.argv) > 1:
@@ -284,11 +1219,46 @@ def main():
             
         # Create output directory if it doesn't exist
         os.makedirs(args.output_directory, exist_ok=True)
+
+        processor_options = {
+            'force': args.force,
+            'streaming': args.streaming,
+            'workers': args.workers,
+            'hash_algorithm': args.hash_algorithm,
+            'records_per_file': args.records_per_file,
+            'max_file_bytes': args.max_file_bytes,
+            'file_per_sheet': args.file_per_sheet,
+            'layout': args.layout,
+            'incremental': args.incremental,
+            'sync_manifests': not args.no_sync,
+            'write_stats': args.stats,
+            'profile': args.profile,
+            'progress_interval': args.progress_interval,
+            'upload_list': args.upload_list,
+            'reader': args.reader,
+            'cache': args.cache,
+            'cache_max_bytes': args.cache_max_mb * 1024 * 1024,
+        }
+
+        if os.path.isdir(args.input_file) or glob.has_magic(args.input_file):
+            input_files = collect_workbooks(args.input_file)
+            if not input_files:
+                print(f"No Excel files found for: {args.input_file}")
+                sys.exit(1)
+            results = run_batch(
+                input_files,
+                args.output_directory,
+                args.jobs,
+                **processor_options
+            )
+            if any(result['status'] == 'failed' for result in results):
+                sys.exit(1)
+            return
         
         processor = ExcelProcessor(
             args.input_file,
             args.output_directory,
-            args.force
+            **processor_options
         )
         processor.process_excel_file()
         
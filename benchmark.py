@@ -0,0 +1,297 @@
+import os
+import sys
+import time
+import json
+import logging
+import argparse
+import resource
+import tempfile
+import multiprocessing
+import contextlib
+import platform
+import glob
+import uuid
+from datetime import datetime, timedelta
+from openpyxl import Workbook
+
+from arg_path_log import ExcelProcessor
+
+SYNTHETIC_HEADER = {
+    'publisher': "PUBLISHER", 'creator': "Creator", 'cost_center': 1234567,
+    'provenance': "Provenance", 'contributor': "Contributor",
+    'security_classification': "Confidential", 'region': "US", 'record_class': "ACC100",
+}
+
+
+# Record date cell styles; 'mixed' cycles through all of them. 'serial' cells are bare numbers,
+# which become dates only with the serial_dates layout transform (None otherwise)
+DATE_FORMATS = ('month', 'day', 'datetime', 'serial', 'mixed')
+
+# Converters the loader benchmark can run; see _run_converter
+CONVERTERS = ('arg_path_log', 'arg_path_log_streaming', 'arg_path_log_pandas', 'arg', 'jsonnmeta')
+
+
+def synthetic_date(row_idx, date_format='month'):
+    """Record date cell for a row in one of the DATE_FORMATS"""
+    if date_format == 'mixed':
+        date_format = DATE_FORMATS[row_idx % (len(DATE_FORMATS) - 1)]
+    year = 2010 + row_idx % 14
+    month = 1 + row_idx % 12
+    if date_format == 'month':
+        return f"{year}-{month:02d}"
+    day = 1 + row_idx % 28
+    if date_format == 'day':
+        return f"{year}-{month:02d}-{day:02d}"
+    value = datetime(year, month, day)
+    if date_format == 'datetime':
+        return value
+    if date_format == 'serial':
+        return (value - datetime(1899, 12, 30)) // timedelta(days=1)
+    raise ValueError(f"Unknown date format: {date_format}")
+
+
+def synthetic_row(sheet_idx, row_idx, date_format='month'):
+    return (
+        f"file_{sheet_idx}_{row_idx}.pdf",
+        f"folder/{row_idx % 50}",
+        "ACC100",
+        synthetic_date(row_idx, date_format),
+        f"Description {row_idx}",
+        "2010-2020",
+        "Major",
+        "Minor",
+        f"REF{row_idx}",
+    )
+
+
+def generate_workbook(path, rows, sheets=1, date_format='month'):
+    """Write a synthetic metadata workbook in the layout ExcelProcessor expects.
+
+    Region is written to both R4 (arg_path_log, arg) and B4 (jsonnmeta) so
+    every benchmarked converter finds its header cells.
+    """
+    wb = Workbook(write_only=True)
+    for sheet_idx in range(sheets):
+        ws = wb.create_sheet(f"Metadata{sheet_idx + 1}")
+        header = [[None] * 18 for _ in range(8)]
+        header[0][1] = "PUBLISHER"       # B1
+        header[0][3] = "Provenance"      # D1
+        header[1][1] = "Creator"         # B2
+        header[1][3] = "Contributor"     # D2
+        header[2][1] = 1234567           # B3
+        header[3][1] = "US"              # B4
+        header[3][3] = "Confidential"    # D4
+        header[3][17] = "US"             # R4
+        for header_row in header:
+            ws.append(header_row)
+        for row_idx in range(rows):
+            ws.append(synthetic_row(sheet_idx, row_idx, date_format))
+    wb.save(path)
+
+
+def isolated_processor_class(state_dir):
+    """ExcelProcessor keeping its log, registry and workbook cache under state_dir.
+
+    Benchmark conversions of temporary workbooks then never reach the
+    registry and history log of real runs next to arg_path_log.py.
+    """
+    log_dir = os.path.join(state_dir, '.logs')
+
+    class BenchmarkProcessor(ExcelProcessor):
+        LOG_DIR = log_dir
+        LOG_FILE = os.path.join(log_dir, 'conversion_history.log')
+        HISTORY_FILE = os.path.join(log_dir, '.conversion_registry')
+        REGISTRY_DB = os.path.join(log_dir, 'conversion_registry.db')
+        CACHE_DIR = os.path.join(log_dir, 'workbook_cache')
+
+    return BenchmarkProcessor
+
+
+def _run_converter(converter, input_file, output_directory):
+    """Convert one workbook and report elapsed time and peak RSS of this process"""
+    if converter.startswith('arg_path_log'):
+        processor = isolated_processor_class(output_directory)(
+            input_file, output_directory, force=True,
+            streaming=converter == 'arg_path_log_streaming', sync_manifests=False,
+            reader='pandas' if converter == 'arg_path_log_pandas' else 'openpyxl'
+        )
+        processor.logger.logger.setLevel(logging.WARNING)
+        convert = processor.process_excel_file
+    elif converter == 'arg':
+        import arg
+        convert = lambda: arg.process_excel_file(input_file, output_directory)
+    elif converter == 'jsonnmeta':
+        import jsonnmeta
+        # jsonnmeta writes to its module-level output directory
+        jsonnmeta.output_directory = output_directory
+        convert = lambda: jsonnmeta.process_excel_file(input_file)
+    else:
+        raise ValueError(f"Unknown converter: {converter}")
+
+    # The script converters print progress for every few rows
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        convert()
+        elapsed = time.perf_counter() - start
+    # ru_maxrss is reported in KiB on Linux
+    peak_rss_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return elapsed, peak_rss_kib
+
+
+def count_manifest_rows(output_directory):
+    """Rows converted, counted as upload_new_file operations in the written manifests"""
+    rows = 0
+    for path in glob.glob(os.path.join(output_directory, '*.a360')):
+        with open(path, 'rb') as manifest_file:
+            rows += sum(1 for line in manifest_file if b'"upload_new_file"' in line)
+    return rows
+
+
+def benchmark_loader(input_file, converter='arg_path_log'):
+    """Run a conversion in a freshly spawned process so peak RSS is not shared"""
+    ctx = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as output_directory:
+        with ctx.Pool(1) as pool:
+            elapsed, peak_rss_kib = pool.apply(
+                _run_converter, (converter, input_file, output_directory)
+            )
+        total_rows = count_manifest_rows(output_directory)
+        files_written = len(glob.glob(os.path.join(output_directory, '*.a360')))
+    return {
+        "converter": converter,
+        "rows": total_rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(total_rows / elapsed, 1) if elapsed else None,
+        "peak_rss_mib": round(peak_rss_kib / 1024, 1),
+        "files_written": files_written,
+    }
+
+
+def write_report(report_path, results, parameters):
+    """Write results with enough context to compare runs across machines and commits"""
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "parameters": parameters,
+        "results": results,
+    }
+    temp_path = report_path + '.tmp'
+    with open(temp_path, 'w') as report_file:
+        json.dump(report, report_file, indent=4)
+    os.replace(temp_path, report_path)
+
+
+def _dict_record_lines(processor, header, row):
+    """Per-row dict building and json.dumps, as the converter did before record templates"""
+    security_classification_map = {
+        "Confidential": "C",
+        "Highly Confidential": "HC",
+        "Internal": "I",
+        "Public": "P"
+    }
+    publisher = header['publisher']
+    cost_center = str(header['cost_center']).zfill(12) if isinstance(header['cost_center'], (int, float)) else header['cost_center'].strip()
+    relation_id = str(uuid.uuid4())
+    record_metadata = {
+        "record_class": header['record_class'],
+        "publisher": publisher,
+        "region": header['region'],
+        "recorddate": processor.format_iso_date(row[3]),
+        "provenance": header['provenance'],
+        "submission_date": datetime.now().isoformat() + "-05:00",
+        "security_classification": security_classification_map.get(header['security_classification'], "I"),
+        "contributor": header['contributor'],
+        "creator": header['creator'],
+        "description": row[4],
+        "title": row[0],
+        "language": "eng",
+        "cost_center": cost_center,
+        "date_range": row[5],
+        "major_description": row[6],
+        "minor_description": row[7],
+        "reference_1": row[8]
+    }
+    file_metadata = {
+        "publisher": publisher,
+        "source_folder_path": row[1],
+        "source_file_name": row[0],
+        "dz_folder_path": f"/dropzone/a360root/{publisher.lower()}/submission/{row[1]}/",
+        "dz_file_name": row[0],
+        "file_tag": processor.get_file_tag(row[0])
+    }
+    return (
+        json.dumps({"operation": "create_record", "relation_id": relation_id,
+                    "record_metadata": record_metadata}, separators=(',', ':')),
+        json.dumps({"operation": "upload_new_file", "relation_id": relation_id,
+                    "file_metadata": file_metadata}, separators=(',', ':')),
+    )
+
+
+def benchmark_record_build(rows):
+    """Time record building and serialization alone, without reading a workbook"""
+    with tempfile.TemporaryDirectory() as state_dir:
+        processor = isolated_processor_class(state_dir)("synthetic.xlsx", state_dir)
+        return _time_record_build(processor, rows)
+
+
+def _time_record_build(processor, rows):
+    results = []
+
+    start = time.perf_counter()
+    for row_idx in range(rows):
+        _dict_record_lines(processor, SYNTHETIC_HEADER, synthetic_row(0, row_idx))
+    elapsed = time.perf_counter() - start
+    results.append({"mode": "dict_records", "rows": rows, "seconds": round(elapsed, 3),
+                    "rows_per_sec": round(rows / elapsed, 1)})
+
+    start = time.perf_counter()
+    template = processor.compile_record_template(SYNTHETIC_HEADER)
+    for row_idx in range(rows):
+        template.render(synthetic_row(0, row_idx))
+    elapsed = time.perf_counter() - start
+    results.append({"mode": "record_template", "rows": rows, "seconds": round(elapsed, 3),
+                    "rows_per_sec": round(rows / elapsed, 1)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Excel to A360 conversion path.")
+    parser.add_argument("--rows", type=int, default=50000, help="Data rows per sheet")
+    parser.add_argument("--sheets", type=int, default=1, help="Number of Metadata sheets")
+    parser.add_argument("--date-format", choices=DATE_FORMATS, default='month',
+                        help="Record date cells of the synthetic workbook")
+    parser.add_argument("--input-file", type=str, help="Use an existing workbook instead of a synthetic one")
+    parser.add_argument("--converters", nargs='+', choices=CONVERTERS,
+                        default=['arg_path_log', 'arg_path_log_streaming'],
+                        help="Converters to run against the workbook")
+    parser.add_argument("--report", type=str, help="Also write the results to this JSON report file")
+    parser.add_argument("--record-build", action="store_true",
+                        help="Only time record building on --rows synthetic rows held in memory")
+    args = parser.parse_args()
+
+    parameters = {key: value for key, value in vars(args).items() if key != 'report'}
+    if args.record_build:
+        results = benchmark_record_build(args.rows)
+        print(json.dumps(results, indent=4))
+        if args.report:
+            write_report(args.report, results, parameters)
+        return
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_file = args.input_file
+        if not input_file:
+            input_file = os.path.join(work_dir, "synthetic_metadata.xlsx")
+            print(f"Generating {args.sheets} sheet(s) x {args.rows} rows...", file=sys.stderr)
+            generate_workbook(input_file, args.rows, args.sheets, args.date_format)
+
+        results = [benchmark_loader(input_file, converter) for converter in args.converters]
+
+    print(json.dumps(results, indent=4))
+    if args.report:
+        write_report(args.report, results, parameters)
+
+
+if __name__ == "__main__":
+    main()
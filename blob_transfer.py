@@ -0,0 +1,371 @@
+import os
+import time
+import uuid
+import hashlib
+import asyncio
+import threading
+import logging
+from collections import Counter
+
+try:
+    from azure.core.exceptions import ServiceRequestError, ServiceResponseError
+    _AZURE_TRANSIENT_ERRORS = (ServiceRequestError, ServiceResponseError)
+except ImportError:
+    _AZURE_TRANSIENT_ERRORS = ()
+
+# Defaults for the download functions; both can be overridden per request
+DOWNLOAD_CONCURRENCY = 8
+DOWNLOAD_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 0.5
+# Ranged downloads of a single large blob
+RANGE_SIZE = 100 * 1024 * 1024
+RANGE_CONCURRENCY = 4
+
+# Statuses worth retrying; other HTTP errors (403, 404...) fail the same way again
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+# Errors without a status worth retrying: the request or response was cut off in transit.
+# Other local errors (disk full, a folder/ placeholder blob, permissions, bugs) are raised at once
+TRANSIENT_ERRORS = _AZURE_TRANSIENT_ERRORS + (ConnectionError, asyncio.TimeoutError)
+
+
+class RequestCounter:
+    """Storage requests of one invocation, by operation and by HTTP status.
+
+    count() tallies the operations issued here; passed as an SDK
+    raw_response_hook, the counter also sees every HTTP response those
+    operations produce (a large download is several ranged GETs).
+    """
+
+    def __init__(self):
+        self.operations = Counter()
+        self.statuses = Counter()
+
+    def count(self, operation):
+        self.operations[operation] += 1
+
+    def __call__(self, response):
+        self.statuses[response.http_response.status_code] += 1
+
+    def summary(self):
+        return {
+            'operations': dict(self.operations),
+            'http_requests': sum(self.statuses.values()),
+            'http_statuses': {str(status): count for status, count in sorted(self.statuses.items())},
+        }
+
+
+def is_not_found(error):
+    return getattr(error, 'status_code', None) == 404
+
+
+def is_retryable(error):
+    """Throttling/server statuses (azure.core errors carry status_code) and TRANSIENT_ERRORS"""
+    status_code = getattr(error, 'status_code', None)
+    if status_code is not None:
+        return status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+async def with_retries(operation, description, retries=DOWNLOAD_RETRIES, backoff=RETRY_BACKOFF_SECONDS):
+    """Await operation(), retrying retryable errors with exponential backoff"""
+    for attempt in range(retries + 1):
+        try:
+            return await operation()
+        except Exception as e:
+            if attempt == retries or not is_retryable(e):
+                raise
+            delay = backoff * 2 ** attempt
+            logging.warning(f"Retrying {description} in {delay:.1f}s after error: {str(e)}")
+            await asyncio.sleep(delay)
+
+
+async def gather_bounded(items, worker, concurrency=DOWNLOAD_CONCURRENCY):
+    """Run worker(item) for every item with at most `concurrency` in flight.
+
+    Returns (item, result, error) in input order; one failure does not
+    cancel the others.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(item):
+        async with semaphore:
+            try:
+                return item, await worker(item), None
+            except Exception as e:
+                return item, None, e
+
+    return await asyncio.gather(*(run(item) for item in items))
+
+
+def temp_download_path(local_file_path):
+    """Hidden, unique name a download is written under until it is complete"""
+    directory, name = os.path.split(local_file_path)
+    return os.path.join(directory, f".{name}.{uuid.uuid4().hex[:8]}.download")
+
+
+def _open_preallocated(temp_path, size):
+    file = open(temp_path, 'wb')
+    if size and hasattr(os, 'posix_fallocate'):
+        try:
+            # Reserve the space up front: no fragmentation, and a full disk fails before the transfer
+            os.posix_fallocate(file.fileno(), 0, size)
+        except OSError:
+            pass
+    return file
+
+
+def _discard(temp_path):
+    try:
+        os.remove(temp_path)
+    except FileNotFoundError:
+        pass
+
+
+def _finish_download(file, temp_path, local_file_path):
+    # Drop any preallocated tail if the blob came back shorter than announced
+    file.truncate()
+    file.close()
+    os.replace(temp_path, local_file_path)
+
+
+async def download_to_file(blob_client, local_file_path, **download_options):
+    """Stream one blob to local_file_path; returns (bytes written, seconds).
+
+    Chunks go straight from the response to a preallocated temporary
+    file, which is renamed into place once complete, so memory stays at
+    one chunk (the SDK's max_chunk_get_size, 4 MiB by default) whatever
+    the blob size and a failed transfer never leaves a partial file.
+    Opening, preallocating, writing and renaming run in worker threads so
+    the event loop keeps serving the other downloads.
+    download_options go to download_blob (e.g. raw_response_hook).
+    """
+    start = time.perf_counter()
+    temp_path = temp_download_path(local_file_path)
+    file = None
+    try:
+        downloader = await blob_client.download_blob(**download_options)
+        file = await asyncio.to_thread(_open_preallocated, temp_path, downloader.size)
+        size = 0
+        async for chunk in downloader.chunks():
+            await asyncio.to_thread(file.write, chunk)
+            size += len(chunk)
+        await asyncio.to_thread(_finish_download, file, temp_path, local_file_path)
+    except BaseException:
+        if file is not None:
+            file.close()
+        _discard(temp_path)
+        raise
+    return size, time.perf_counter() - start
+
+
+def download_to_file_sync(blob_client, local_file_path):
+    """download_to_file for the synchronous BlobClient"""
+    start = time.perf_counter()
+    temp_path = temp_download_path(local_file_path)
+    try:
+        downloader = blob_client.download_blob()
+        size = 0
+        file = _open_preallocated(temp_path, downloader.size)
+        with file:
+            for chunk in downloader.chunks():
+                file.write(chunk)
+                size += len(chunk)
+            _finish_download(file, temp_path, local_file_path)
+    except BaseException:
+        _discard(temp_path)
+        raise
+    return size, time.perf_counter() - start
+
+
+class OrderedDigest:
+    """SHA-256 of a file whose fixed-size ranges are written out of order.
+
+    Bytes arriving at the hash position are hashed straight from the
+    chunk; bytes written ahead of it are read back (from the page cache)
+    once the ranges before them are done. The digest is therefore ready as
+    soon as the last byte is written.
+    """
+
+    READ_BLOCK = 1024 * 1024
+
+    def __init__(self, fd, size, range_size):
+        self.fd = fd
+        self.size = size
+        self.range_size = range_size
+        self.hasher = hashlib.sha256()
+        self.position = 0
+        # range index -> bytes written contiguously from the start of that range
+        self.written = {}
+
+    def wrote(self, offset, chunk):
+        """Record a chunk that has been written at offset"""
+        index = offset // self.range_size
+        end = offset + len(chunk)
+        self.written[index] = max(self.written.get(index, 0), end - index * self.range_size)
+        if offset <= self.position < end:
+            # Retried ranges may repeat bytes that are already hashed
+            self.hasher.update(memoryview(chunk)[self.position - offset:])
+            self.position = end
+        self._catch_up()
+
+    def _catch_up(self):
+        while self.position < self.size:
+            index = self.position // self.range_size
+            available = index * self.range_size + self.written.get(index, 0)
+            if available <= self.position:
+                return
+            block = os.pread(self.fd, min(self.READ_BLOCK, available - self.position), self.position)
+            self.hasher.update(block)
+            self.position += len(block)
+
+    def hexdigest(self):
+        if self.position != self.size:
+            raise RuntimeError(f"Digest incomplete: {self.position} of {self.size} bytes hashed")
+        return self.hasher.hexdigest()
+
+
+def _pwrite_all(fd, data, offset):
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+
+async def download_ranges_to_file(blob_client, local_file_path, size, range_size=RANGE_SIZE,
+                                  concurrency=RANGE_CONCURRENCY, retries=DOWNLOAD_RETRIES,
+                                  backoff=RETRY_BACKOFF_SECONDS, **download_options):
+    """Download a blob of `size` bytes as concurrent ranges into one file.
+
+    Each range streams its chunks to their offsets in a preallocated
+    temporary file with pwrite (in worker threads, off the event loop),
+    and an OrderedDigest hashes the bytes in file order as they land, so the data is written once and never merged
+    or re-read in a separate pass. download_options go to every
+    download_blob call, e.g. the etag and match_condition that keep all
+    ranges on the same blob version. Returns (sha256 hex digest, seconds).
+    """
+    start = time.perf_counter()
+    temp_path = temp_download_path(local_file_path)
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        if size and hasattr(os, 'posix_fallocate'):
+            try:
+                await asyncio.to_thread(os.posix_fallocate, fd, 0, size)
+            except OSError:
+                pass
+        # pread needs a readable descriptor on the same file for the out-of-order catch-up
+        read_fd = os.open(temp_path, os.O_RDONLY)
+        try:
+            digest = OrderedDigest(read_fd, size, range_size)
+            # Chunks are written and hashed in worker threads; the digest takes them one at a time
+            digest_lock = threading.Lock()
+
+            def write_chunk(chunk, position):
+                _pwrite_all(fd, chunk, position)
+                with digest_lock:
+                    digest.wrote(position, chunk)
+
+            async def download_range(offset):
+                length = min(range_size, size - offset)
+                stream = await blob_client.download_blob(offset=offset, length=length, **download_options)
+                position = offset
+                async for chunk in stream.chunks():
+                    await asyncio.to_thread(write_chunk, chunk, position)
+                    position += len(chunk)
+                if position != offset + length:
+                    # The stream ended early, as a dropped connection does; retried like one
+                    raise ConnectionError(f"Range at {offset} returned {position - offset} of {length} bytes")
+
+            async def download_range_with_retries(offset):
+                await with_retries(
+                    lambda: download_range(offset), f"range {offset} of {local_file_path}", retries, backoff
+                )
+
+            for offset, _, error in await gather_bounded(
+                range(0, size, range_size), download_range_with_retries, concurrency
+            ):
+                if error is not None:
+                    raise error
+            file_hash = digest.hexdigest()
+        finally:
+            os.close(read_fd)
+        os.close(fd)
+        fd = None
+        os.replace(temp_path, local_file_path)
+    except BaseException:
+        if fd is not None:
+            os.close(fd)
+        _discard(temp_path)
+        raise
+    return file_hash, time.perf_counter() - start
+
+
+def transfer_rate(size, seconds):
+    """Bytes per second, for logs and responses"""
+    return round(size / seconds, 1) if seconds > 0 else None
+
+
+def listing_properties(blob):
+    """JSON-ready size, etag and last_modified of a list_blobs item"""
+    last_modified = getattr(blob, 'last_modified', None)
+    return {
+        'size': getattr(blob, 'size', None),
+        'etag': getattr(blob, 'etag', None),
+        'last_modified': last_modified.isoformat() if last_modified else None,
+    }
+
+
+async def download_blobs(container_client, blobs, download_dir, concurrency=DOWNLOAD_CONCURRENCY,
+                         retries=DOWNLOAD_RETRIES, backoff=RETRY_BACKOFF_SECONDS, counter=None):
+    """Download listed blobs into download_dir (by base name), `concurrency` at a time.
+
+    blobs are the items list_blobs returned, so no existence check is
+    made: a blob deleted since the listing comes back as 404 from the
+    download and is skipped. Returns (downloaded, failed): downloaded
+    lists {'name', 'local_path', 'size', 'etag', 'last_modified',
+    'bytes_per_sec'} in listing order, failed lists {'name', 'error'} for
+    blobs that still failed after their retries. counter, a
+    RequestCounter, sees every request made.
+    """
+    download_options = {'raw_response_hook': counter} if counter is not None else {}
+
+    async def attempt(blob_client, local_file_path):
+        if counter is not None:
+            counter.count('download')
+        return await download_to_file(blob_client, local_file_path, **download_options)
+
+    async def download(blob):
+        blob_client = container_client.get_blob_client(blob.name)
+        local_file_path = os.path.join(download_dir, os.path.basename(blob.name))
+        try:
+            size, seconds = await with_retries(
+                lambda: attempt(blob_client, local_file_path),
+                f"download of {blob.name}", retries, backoff
+            )
+        except Exception as e:
+            if not is_not_found(e):
+                raise
+            logging.warning(f"Blob {blob.name} was deleted after it was listed; skipping")
+            return None
+        bytes_per_sec = transfer_rate(size, seconds)
+        logging.info(f"Successfully downloaded: {blob.name} ({size} bytes, {bytes_per_sec} bytes/s)")
+        # Carried over from the listing, so a later skip-if-unchanged check needs no extra request
+        properties = listing_properties(blob)
+        return {
+            'name': blob.name,
+            'local_path': local_file_path,
+            'size': size,
+            'etag': properties['etag'],
+            'last_modified': properties['last_modified'],
+            'bytes_per_sec': bytes_per_sec,
+        }
+
+    downloaded = []
+    failed = []
+    for blob, result, error in await gather_bounded(blobs, download, concurrency):
+        if error is not None:
+            logging.error(f"Error downloading blob {blob.name}: {str(error)}")
+            failed.append({'name': blob.name, 'error': str(error)})
+        elif result is not None:
+            downloaded.append(result)
+    return downloaded, failed
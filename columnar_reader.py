@@ -0,0 +1,96 @@
+import importlib.util
+from date_utils import format_iso_date_column
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+
+def excel_engine():
+    """pandas engine for .xlsx: calamine (Rust) when installed, openpyxl otherwise"""
+    if importlib.util.find_spec('python_calamine') is not None:
+        return 'calamine'
+    return 'openpyxl'
+
+
+class ColumnarRows:
+    """Data rows of a sheet plus the (record date, file tag) computed for each.
+
+    Iterates like the openpyxl path (tuples in ROW_FIELDS order), so
+    fingerprints and chunking see the same rows; convert_rows picks up
+    `prepared` to skip the per-row transforms.
+    """
+
+    def __init__(self, rows, prepared):
+        self.rows = rows
+        self.prepared = prepared
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+
+class ColumnarSheet:
+    """One sheet parsed into a DataFrame in a single read.
+
+    Offers the parts of openpyxl's worksheet API that ExcelProcessor uses
+    (max_row and iter_rows(values_only=True)), so header reading is
+    unchanged. data_rows() slices the data region and runs the layout's
+    transforms a column at a time.
+    """
+
+    def __init__(self, frame):
+        # Empty cells come back as NaN; the openpyxl path yields None
+        self.frame = frame.astype(object).where(frame.notna(), None)
+        self.max_row = len(self.frame)
+
+    def iter_rows(self, min_row=1, max_row=None, max_col=None, values_only=True):
+        frame = self.frame.iloc[min_row - 1:max_row, :max_col]
+        padding = (None,) * max((max_col or 0) - frame.shape[1], 0)
+        for row in frame.itertuples(index=False, name=None):
+            yield row + padding
+
+    def column(self, index, start):
+        if index < self.frame.shape[1]:
+            return self.frame.iloc[start:, index].reset_index(drop=True)
+        return pd.Series([None] * max(self.max_row - start, 0), dtype=object)
+
+    def data_rows(self, layout):
+        start = layout.data_start_row - 1
+        columns = [self.column(index, start) for index in layout.column_indexes]
+
+        # Same stopping rule as iter_data_rows: the first row without a file name
+        missing = columns[0].isna().to_numpy()
+        if missing.any():
+            end = int(missing.argmax())
+            columns = [column.iloc[:end] for column in columns]
+
+        record_dates = format_iso_date_column(
+            columns[3], layout.transforms['month_end'], layout.transforms['serial_dates']
+        ).tolist()
+        file_tags = layout.file_tag_column(columns[0])
+        rows = list(zip(*(column.tolist() for column in columns)))
+        return ColumnarRows(rows, list(zip(record_dates, file_tags)))
+
+
+class ColumnarWorkbook:
+    """Workbook facade over pandas.ExcelFile with openpyxl-style sheet access.
+
+    Numeric cells come back as pandas converts them: integral floats
+    (e.g. 1E16) become ints, and error cells become empty.
+    """
+
+    def __init__(self, path):
+        if pd is None:
+            raise ImportError("The pandas reader requires the pandas package")
+        self.excel = pd.ExcelFile(path, engine=excel_engine())
+        self.sheetnames = self.excel.sheet_names
+
+    def __getitem__(self, sheet_name):
+        return ColumnarSheet(self.excel.parse(sheet_name, header=None, dtype=object))
+
+    def close(self):
+        self.excel.close()
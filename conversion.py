@@ -1,8 +1,9 @@
 import os
-import json
 import openpyxl
 import datetime
-import time
+import logging
+from manifest_writer import ManifestBatch
+from watcher import DirectoryWatcher
 import uuid
 
 # Security Classification Mapping
@@ -24,14 +25,6 @@ def get_security_classification(value):
 def get_submission_date():
     return datetime.datetime.utcnow().isoformat() + 'Z'
 
-# Check if the file has already been processed
-def is_file_processed(file_path):
-    if not os.path.exists(log_file_path):
-        return False
-    with open(log_file_path, 'r') as log_file:
-        processed_files = log_file.read().splitlines()
-    return file_path in processed_files
-
 # Log the processed file
 def log_processed_file(file_path):
     with open(log_file_path, 'a') as log_file:
@@ -39,100 +32,90 @@ def log_processed_file(file_path):
 
 # Function to process Excel and convert to JSON using openpyxl
 def process_excel_file(file_path, output_directory, records_per_file=100):
-    if is_file_processed(file_path):
-        print(f"File {file_path} has already been processed. Skipping.")
-        return
+    # DirectoryWatcher only dispatches files missing from processed_files.log, which it reads once
 
     # Load Excel file with openpyxl
     workbook = openpyxl.load_workbook(file_path, data_only=True)
-
-    for sheet_name in workbook.sheetnames:
-        sheet = workbook[sheet_name]
-        current_records = []
-        file_counter = 1
-
-        # Iterate over the rows starting from row 9 (1-based indexing in Excel)
-        for row in sheet.iter_rows(min_row=9, values_only=True):
-            if row[0] is None:
-                continue  # Skip rows without data
-
-            # Generate unique relation_id using uuid
-            relation_id = str(uuid.uuid4())
-
-            record_metadata = {
-                "record_class": row[2],  # Assuming column C9
-                "publisher": sheet['B1'].value,  # B1
-                "region": sheet['B4'].value,  # B4
-                "recordDate": row[8],  # Date
-                "provenance": sheet['D1'].value,  # D1
-                "security_classification": get_security_classification(sheet['D4'].value),  # D4
-                "contributor": sheet['D3'].value,  # D3
-                "creator": sheet['B2'].value,  # B2
-                "description": row[4],  # Description from row
-                "language": "eng",
-                "title": row[5],  # Title from row
-                "Date Range": row[6],  # Date Range
-                "Major Description": row[7],  # Major Description
-                "Minor Description": row[8],  # Minor Description
-                "Reference 1": row[9],  # Reference 1
-                "submission_date": get_submission_date()
-            }
-
-            file_metadata = {
-                "publisher": sheet['B1'].value,  # B1
-                "source_folder_path": row[1],  # Source folder path
-                "source_file_name": row[0],  # Source file name
-                "dz_file_name": row[0],  # dz file name
-                "file_tag": "zip"  # Assuming a default file tag
-            }
-
-            create_record = {
-                "operation": "create_record",
-                "relation_id": relation_id,
-                "record_metadata": record_metadata
-            }
-
-            upload_new_file = {
-                "operation": "upload_new_file",
-                "relation_id": relation_id,
-                "file_metadata": file_metadata
-            }
-
-            current_records.append(create_record)
-            current_records.append(upload_new_file)
-
-            if len(current_records) >= records_per_file * 2:
+    # Every manifest of the workbook appears at once when the batch closes;
+    # a failure partway through removes the staged files instead
+    with ManifestBatch() as batch:
+        for sheet_name in workbook.sheetnames:
+            sheet = workbook[sheet_name]
+            current_records = []
+            file_counter = 1
+
+            # Iterate over the rows starting from row 9 (1-based indexing in Excel)
+            for row in sheet.iter_rows(min_row=9, values_only=True):
+                if row[0] is None:
+                    continue  # Skip rows without data
+
+                # Generate unique relation_id using uuid
+                relation_id = str(uuid.uuid4())
+
+                record_metadata = {
+                    "record_class": row[2],  # Assuming column C9
+                    "publisher": sheet['B1'].value,  # B1
+                    "region": sheet['B4'].value,  # B4
+                    "recordDate": row[8],  # Date
+                    "provenance": sheet['D1'].value,  # D1
+                    "security_classification": get_security_classification(sheet['D4'].value),  # D4
+                    "contributor": sheet['D3'].value,  # D3
+                    "creator": sheet['B2'].value,  # B2
+                    "description": row[4],  # Description from row
+                    "language": "eng",
+                    "title": row[5],  # Title from row
+                    "Date Range": row[6],  # Date Range
+                    "Major Description": row[7],  # Major Description
+                    "Minor Description": row[8],  # Minor Description
+                    "Reference 1": row[9],  # Reference 1
+                    "submission_date": get_submission_date()
+                }
+
+                file_metadata = {
+                    "publisher": sheet['B1'].value,  # B1
+                    "source_folder_path": row[1],  # Source folder path
+                    "source_file_name": row[0],  # Source file name
+                    "dz_file_name": row[0],  # dz file name
+                    "file_tag": "zip"  # Assuming a default file tag
+                }
+
+                create_record = {
+                    "operation": "create_record",
+                    "relation_id": relation_id,
+                    "record_metadata": record_metadata
+                }
+
+                upload_new_file = {
+                    "operation": "upload_new_file",
+                    "relation_id": relation_id,
+                    "file_metadata": file_metadata
+                }
+
+                current_records.append(create_record)
+                current_records.append(upload_new_file)
+
+                if len(current_records) >= records_per_file * 2:
+                    output_file_path = os.path.join(output_directory, f'{sheet_name}_{file_counter}.a360')
+                    batch.write_records(output_file_path, current_records)
+                    current_records = []
+                    file_counter += 1
+
+            if current_records:
                 output_file_path = os.path.join(output_directory, f'{sheet_name}_{file_counter}.a360')
-                with open(output_file_path, 'w') as json_file:
-                    for record in current_records:
-                        json.dump(record, json_file, separators=(',', ':'))
-                        json_file.write("\n")
+                batch.write_records(output_file_path, current_records)
                 current_records = []
-                file_counter += 1
-
-        if current_records:
-            output_file_path = os.path.join(output_directory, f'{sheet_name}_{file_counter}.a360')
-            with open(output_file_path, 'w') as json_file:
-                for record in current_records:
-                    json.dump(record, json_file, separators=(',', ':'))
-                    json_file.write("\n")
-            current_records = []
 
     log_processed_file(file_path)
     print(f"Finished processing {file_path}")
 
-# Function to check directory for new Excel files
-def check_directory_for_new_files(excel_directory, output_directory, polling_interval=10):
-    print(f"Watching directory: {excel_directory} for new Excel files...")
-    while True:
-        for file_name in os.listdir(excel_directory):
-            file_path = os.path.join(excel_directory, file_name)
-            if file_name.endswith(".xlsx") and not is_file_processed(file_path):
-                print(f"Processing new file: {file_path}")
-                process_excel_file(file_path, output_directory)
-        time.sleep(polling_interval)
-
 if __name__ == "__main__":
     excel_directory = "/path/to/excel_directory/"
     output_directory = "/path/to/output_directory/"
-    check_directory_for_new_files(excel_directory, output_directory)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    DirectoryWatcher(
+        excel_directory,
+        output_directory,
+        process_excel_file,
+        processed_log=log_file_path,
+        poll_interval=10
+    ).run()
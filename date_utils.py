@@ -0,0 +1,80 @@
+import calendar
+import numbers
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+# Day 0 of Excel's 1900 date system, shifted for its fictional 1900-02-29
+EXCEL_EPOCH = datetime(1899, 12, 30)
+EXCEL_MAX_SERIAL = 2958466  # 9999-12-31 + 1
+
+ISO_OFFSET = "-05:00"
+
+
+def _iso(value):
+    return datetime(value.year, value.month, value.day).isoformat() + ISO_OFFSET
+
+
+@lru_cache(maxsize=4096)
+def _format_cached(excel_date, month_end, serial_dates):
+    try:
+        if isinstance(excel_date, str):
+            if len(excel_date) == 7:
+                year, month = excel_date.split('-')
+                day = calendar.monthrange(int(year), int(month))[1] if month_end else 1
+                excel_date = f"{year}-{month}-{day}"
+            return datetime.strptime(excel_date, "%Y-%m-%d").isoformat() + ISO_OFFSET
+        if isinstance(excel_date, date):
+            return _iso(excel_date)
+        if serial_dates and isinstance(excel_date, numbers.Real):
+            serial = int(excel_date)
+            if not 1 <= serial < EXCEL_MAX_SERIAL:
+                return None
+            # Serials before 1900-03-01 are one day off because of the leap-year bug
+            if serial < 61:
+                serial += 1
+            return _iso(EXCEL_EPOCH + timedelta(days=serial))
+    except (ValueError, TypeError, OverflowError):
+        return None
+    return None
+
+
+def format_iso_date(excel_date, month_end=True, serial_dates=False):
+    """Normalize a record date cell to an ISO 8601 timestamp at midnight, -05:00.
+
+    Accepts "YYYY-MM" (last day of the month, or the first with
+    month_end=False), "YYYY-MM-DD" and datetime/date values. Numbers are
+    read as Excel serial dates only with serial_dates=True: openpyxl
+    already returns date-formatted cells as datetime, so a bare number is
+    usually something else, such as a year typed as 2020. Anything else
+    gives None. Results are memoized on the raw value because record
+    dates repeat heavily.
+    """
+    # bool hashes like 0/1 and would share cache entries with serial numbers
+    if isinstance(excel_date, bool):
+        return None
+    try:
+        return _format_cached(excel_date, month_end, serial_dates)
+    except TypeError:
+        # Unhashable cell value
+        return None
+
+
+def format_iso_date_column(values, month_end=True, serial_dates=False):
+    """Normalize a pandas Series of record dates column-at-a-time.
+
+    Each distinct value is formatted once and the results are broadcast
+    back with the factorized codes, so the cost follows the number of
+    distinct dates rather than the number of rows.
+    """
+    import numpy as np
+    import pandas as pd
+
+    # factorize treats True as 1; bools format to None, so drop them first
+    is_bool = np.fromiter((type(value) is bool for value in values), dtype=bool, count=len(values))
+    if is_bool.any():
+        values = values.mask(is_bool, None)
+    codes, uniques = pd.factorize(values)
+    # Missing values get code -1, which picks the trailing None
+    formatted = [format_iso_date(value, month_end, serial_dates) for value in uniques.tolist()]
+    formatted.append(None)
+    return pd.Series(np.asarray(formatted, dtype=object)[codes], index=values.index, dtype=object)
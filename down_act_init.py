@@ -1,27 +1,163 @@
 import os
+import sqlite3
+from collections import Counter
+from datetime import datetime
 from azure.storage.blob import BlobServiceClient
 import logging
+from blob_transfer import download_to_file_sync, transfer_rate
 
 # Configure logger
 configure_azure_monitor()
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-# Path to the tracking file
+# Sync state of every downloaded blob, shared by every instance through the landing zone;
+# the old line-per-name tracking file is imported once
+SYNC_DB_PATH = "/ark/landing_zone/downloaded_files.db"
 TRACKING_FILE_PATH = "/ark/landing_zone/downloaded_files.txt"
+DOWNLOAD_DIRECTORY = "/ark/landing_zone/downloads_from_azure"
 
-def load_downloaded_files():
-    """Load the list of already downloaded files from the tracking file."""
-    if os.path.exists(TRACKING_FILE_PATH):
-        with open(TRACKING_FILE_PATH, "r") as file:
-            return set(line.strip() for line in file)
-    return set()
 
-def update_downloaded_files(new_files):
-    """Append newly downloaded files to the tracking file."""
-    with open(TRACKING_FILE_PATH, "a") as file:
-        for file_name in new_files:
-            file.write(f"{file_name}\n")
+class BlobSyncRegistry:
+    """Indexed record of downloaded blobs, keyed by (container, full blob path).
+
+    Each entry keeps the etag, size and last_modified of the version that
+    was downloaded and the local file it was written to, so a listed blob
+    is only fetched again when it is new or has changed, and no two blobs
+    are recorded at the same local file. Backed by SQLite: lookups by blob
+    or by local path use an index however many blobs have been synced, and
+    nothing is read into memory up front. The database lives on the shared
+    landing-zone mount, where WAL's shared-memory index does not work, so
+    it keeps the rollback journal and waits up to BUSY_TIMEOUT_SECONDS for
+    other instances' write locks. Names from the
+    old tracking file, which held bare file names, are kept in
+    legacy_names until a listed blob claims them.
+    """
+
+    BUSY_TIMEOUT_SECONDS = 30
+
+    def __init__(self, db_path, legacy_path=None):
+        self.db_path = db_path
+        self.legacy_path = legacy_path
+        self.conn = sqlite3.connect(db_path, timeout=self.BUSY_TIMEOUT_SECONDS)
+        self.conn.execute("PRAGMA journal_mode=DELETE")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS synced_blobs (
+                container TEXT NOT NULL,
+                blob_path TEXT NOT NULL,
+                etag TEXT,
+                size INTEGER,
+                last_modified TEXT,
+                local_path TEXT,
+                synced_at TEXT NOT NULL,
+                PRIMARY KEY (container, blob_path)
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS synced_blobs_local_path ON synced_blobs (local_path)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS legacy_names (file_name TEXT PRIMARY KEY)")
+        self.conn.commit()
+        if legacy_path and os.path.exists(legacy_path):
+            self._migrate_tracking_file()
+
+    def _migrate_tracking_file(self):
+        """Import the bare file names of the tracking file, then move it out of the way"""
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            if not os.path.exists(self.legacy_path):
+                # Another activity finished the migration while we waited for the lock
+                return
+            with open(self.legacy_path, "r") as file:
+                names = {line.strip() for line in file if line.strip()}
+            self.conn.executemany("INSERT OR IGNORE INTO legacy_names (file_name) VALUES (?)", ((name,) for name in names))
+            os.replace(self.legacy_path, self.legacy_path + ".migrated")
+
+    def status(self, container, blob):
+        """'new', 'changed' or 'unchanged' for a list_blobs item; 'legacy' if only its file name was tracked"""
+        row = self.conn.execute(
+            "SELECT etag, size FROM synced_blobs WHERE container = ? AND blob_path = ?",
+            (container, blob.name)
+        ).fetchone()
+        if row is None:
+            legacy = self.conn.execute(
+                "SELECT 1 FROM legacy_names WHERE file_name = ?", (blob.name.split("/")[-1],)
+            ).fetchone()
+            return "legacy" if legacy else "new"
+        return "unchanged" if (row[0], row[1]) == (blob.etag, blob.size) else "changed"
+
+    def local_path(self, container, blob_path):
+        """Local file a blob was last downloaded to, or None"""
+        row = self.conn.execute(
+            "SELECT local_path FROM synced_blobs WHERE container = ? AND blob_path = ?",
+            (container, blob_path)
+        ).fetchone()
+        return row[0] if row else None
+
+    def owner(self, local_path):
+        """(container, blob path) recorded at a local file, or None"""
+        return self.conn.execute(
+            "SELECT container, blob_path FROM synced_blobs WHERE local_path = ?", (local_path,)
+        ).fetchone()
+
+    def record(self, container, blob, local_path):
+        with self.conn:
+            self._record(container, blob, local_path)
+
+    def adopt_legacy(self, container, blob, local_path):
+        """Record a blob at the file the tracking file listed, and retire the name"""
+        with self.conn:
+            self._record(container, blob, local_path)
+            self.conn.execute("DELETE FROM legacy_names WHERE file_name = ?", (os.path.basename(local_path),))
+
+    def forget_legacy(self, file_name):
+        with self.conn:
+            self.conn.execute("DELETE FROM legacy_names WHERE file_name = ?", (file_name,))
+
+    def _record(self, container, blob, local_path):
+        last_modified = blob.last_modified.isoformat() if blob.last_modified else None
+        self.conn.execute(
+            "INSERT OR REPLACE INTO synced_blobs "
+            "(container, blob_path, etag, size, last_modified, local_path, synced_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (container, blob.name, blob.etag, blob.size, last_modified, local_path,
+             datetime.utcnow().isoformat(timespec="seconds"))
+        )
+
+    def compact(self, container, prefix, listed_paths):
+        """Forget blobs under prefix that are no longer listed, then reclaim the space; returns entries removed"""
+        with self.conn:
+            stored = self.conn.execute(
+                "SELECT blob_path FROM synced_blobs WHERE container = ? AND substr(blob_path, 1, ?) = ?",
+                (container, len(prefix), prefix)
+            ).fetchall()
+            removed = [(container, path) for (path,) in stored if path not in listed_paths]
+            self.conn.executemany("DELETE FROM synced_blobs WHERE container = ? AND blob_path = ?", removed)
+        self.conn.execute("VACUUM")
+        return len(removed)
+
+    def close(self):
+        self.conn.close()
+
+
+def local_path_for(registry, container, blob_path):
+    """Local file for a blob: where it was downloaded before, else its file name in DOWNLOAD_DIRECTORY.
+
+    The landing zone is flat; a blob whose file name already belongs to
+    another blob gets its full path, with '/' as '__', as its file name
+    instead of overwriting that blob's file.
+    """
+    local_path = registry.local_path(container, blob_path)
+    if local_path:
+        return local_path
+    local_path = os.path.join(DOWNLOAD_DIRECTORY, blob_path.split("/")[-1])
+    owner = registry.owner(local_path)
+    if owner is None or tuple(owner) == (container, blob_path):
+        return local_path
+    qualified_path = os.path.join(DOWNLOAD_DIRECTORY, blob_path.replace("/", "__"))
+    logger.warning(f"'{local_path}' belongs to '{owner[1]}'; downloading '{blob_path}' to '{qualified_path}'")
+    return qualified_path
+
 
 def main(input: dict) -> dict:
     try:
@@ -35,39 +171,64 @@ def main(input: dict) -> dict:
             logger.error("Filepath not provided for download action")
             return {"status": "fail", "message": "Filepath not provided"}
 
-        # Load previously downloaded files
-        downloaded_files = load_downloaded_files()
+        registry = BlobSyncRegistry(SYNC_DB_PATH, TRACKING_FILE_PATH)
+        try:
+            container_client = blob_service_client.get_container_client(container_name)
+            blobs = list(container_client.list_blobs(name_starts_with=filepath))
+            # A tracking-file name only identifies a blob if no other listed blob shares it
+            name_counts = Counter(blob.name.split("/")[-1] for blob in blobs)
+
+            new_files = []  # To track files downloaded in this session
+            counts = {"new": 0, "changed": 0, "unchanged": 0, "legacy": 0}
+            for blob in blobs:
+                file_name = blob.name.split("/")[-1]  # Extract the file name from the path
 
-        container_client = blob_service_client.get_container_client(container_name)
-        blobs = container_client.list_blobs(name_starts_with=filepath)
+                # Skip blobs whose listed etag and size match the version already downloaded
+                status = registry.status(container_name, blob)
+                if status == "legacy":
+                    local_path = os.path.join(DOWNLOAD_DIRECTORY, file_name)
+                    if name_counts[file_name] == 1 and registry.owner(local_path) is None:
+                        logger.info(f"Skipping file downloaded before path tracking: {blob.name}")
+                        registry.adopt_legacy(container_name, blob, local_path)
+                        counts["legacy"] += 1
+                        continue
+                    logger.warning(
+                        f"'{file_name}' in the old tracking file matches {name_counts[file_name]} listed blobs; "
+                        f"downloading '{blob.name}'"
+                    )
+                    registry.forget_legacy(file_name)
+                    status = "new"
+                counts[status] += 1
+                if status == "unchanged":
+                    continue
 
-        new_files = []  # To track files downloaded in this session
-        for blob in blobs:
-            file_name = blob.name.split("/")[-1]  # Extract the file name from the path
+                local_path = local_path_for(registry, container_name, blob.name)
+                blob_client = blob_service_client.get_blob_client(container=container_name, blob=blob.name)
 
-            # Skip files that have already been downloaded
-            if file_name in downloaded_files:
-                logger.info(f"Skipping already downloaded file: {file_name}")
-                continue
+                # Stream the new file to disk in chunks; it appears under local_path once complete
+                size, seconds = download_to_file_sync(blob_client, local_path)
+                registry.record(container_name, blob, local_path)
 
-            # Define local path for the new file
-            local_path = f"/ark/landing_zone/downloads_from_azure/{file_name}"
-            blob_client = blob_service_client.get_blob_client(container=container_name, blob=blob.name)
-            
-            # Download the new file
-            with open(local_path, "wb") as download_file:
-                download_stream = blob_client.download_blob()
-                download_file.write(download_stream.readall())
-            
-            new_files.append(file_name)
-            logger.info(f"File '{file_name}' downloaded successfully to '{local_path}'")
+                new_files.append(os.path.basename(local_path))
+                logger.info(
+                    f"File '{blob.name}' ({status}) downloaded successfully to '{local_path}' "
+                    f"({size} bytes, {transfer_rate(size, seconds)} bytes/s)"
+                )
 
-        # Update the tracking file with newly downloaded files
-        update_downloaded_files(new_files)
+            logger.info(
+                f"Sync of {filepath}: {counts['new']} new, {counts['changed']} changed, "
+                f"{counts['unchanged']} unchanged, {counts['legacy']} adopted from the tracking file"
+            )
+            if input.get("compact"):
+                removed = registry.compact(container_name, filepath, {blob.name for blob in blobs})
+                logger.info(f"Compacted sync registry: removed {removed} entries for deleted blobs")
+        finally:
+            registry.close()
 
         return {
             "status": "success",
-            "message": f"Newly downloaded files: {new_files}"
+            "message": f"Newly downloaded files: {new_files}",
+            "counts": counts
         }
 
     except Exception as e:
@@ -9,6 +9,7 @@ from azure.identity.aio import ManagedIdentityCredential
 import aiohttp
 import re
 import pathlib
+from blob_transfer import DOWNLOAD_CONCURRENCY, DOWNLOAD_RETRIES, RequestCounter, download_blobs
 
 blobServiceClient = None
 
@@ -28,6 +29,9 @@ async def main(req: func.HttpRequest) -> func.HttpResponse:
         # Get folder path and local download path from request
         path = req.params.get('name')
         local_path = req.params.get('download_path', '/tmp/downloads')
+        # Parallel downloads and per-blob retries; the environment sets the defaults
+        concurrency = req.params.get('concurrency') or os.environ.get('DOWNLOAD_CONCURRENCY', DOWNLOAD_CONCURRENCY)
+        retries = req.params.get('retries') or os.environ.get('DOWNLOAD_RETRIES', DOWNLOAD_RETRIES)
         
         # Log incoming request details
         logging.info(f"Received request - Path: {path}, Local path: {local_path}")
@@ -37,6 +41,8 @@ async def main(req: func.HttpRequest) -> func.HttpResponse:
                 req_body = req.get_json()
                 path = req_body.get('name')
                 local_path = req_body.get('download_path', '/tmp/downloads')
+                concurrency = req_body.get('concurrency', concurrency)
+                retries = req_body.get('retries', retries)
                 logging.info(f"Retrieved from body - Path: {path}, Local path: {local_path}")
             except ValueError:
                 logging.error("Failed to parse request body")
@@ -72,10 +78,13 @@ async def main(req: func.HttpRequest) -> func.HttpResponse:
             container_client = blobServiceClient.get_container_client(azure_container_name)
             logging.info(f"Accessing container: {azure_container_name}")
             
+            # Listed items keep their size, etag and last_modified for the downloads
+            requests = RequestCounter()
             blob_list = []
             try:
-                async for blob in container_client.list_blobs(name_starts_with=path):
-                    blob_list.append(blob.name)
+                requests.count('list')
+                async for blob in container_client.list_blobs(name_starts_with=path, raw_response_hook=requests):
+                    blob_list.append(blob)
                 logging.info(f"Found {len(blob_list)} blobs in path {path}")
             except Exception as e:
                 logging.error(f"Error listing blobs: {str(e)}")
@@ -88,28 +97,19 @@ async def main(req: func.HttpRequest) -> func.HttpResponse:
                 )
 
             if blob_list:
-                downloaded_files = []
-                for blob_name in blob_list:
-                    try:
-                        blob_client = container_client.get_blob_client(blob_name)
-                        if await blob_client.exists():
-                            local_file_name = os.path.basename(blob_name)
-                            local_file_path = os.path.join(download_dir, local_file_name)
-                            
-                            downloader = await blob_client.download_blob()
-                            content = await downloader.readall()
-                            
-                            with open(local_file_path, 'wb') as file:
-                                file.write(content)
-                            
-                            downloaded_files.append({
-                                'name': blob_name,
-                                'local_path': local_file_path
-                            })
-                            logging.info(f"Successfully downloaded: {blob_name}")
-                    except Exception as e:
-                        logging.error(f"Error downloading blob {blob_name}: {str(e)}")
-                        continue
+                downloaded_files, failed_files = await download_blobs(
+                    container_client,
+                    blob_list,
+                    download_dir,
+                    concurrency=int(concurrency),
+                    retries=int(retries),
+                    counter=requests
+                )
+                logging.info(
+                    f"Downloaded {len(downloaded_files)} of {len(blob_list)} blobs "
+                    f"({len(failed_files)} failed) with concurrency {concurrency}"
+                )
+                logging.info(f"Storage requests: {requests.summary()}")
 
                 timeEndGet = datetime.utcnow().isoformat(sep=" ", timespec="milliseconds")
                 
@@ -123,7 +123,8 @@ async def main(req: func.HttpRequest) -> func.HttpResponse:
                         "status": "success",
                         "files": downloaded_files,
                         "count": len(downloaded_files),
-                        "download_directory": download_dir
+                        "download_directory": download_dir,
+                        "requests": requests.summary()
                     }),
                     headers=headers,
                     status_code=200
@@ -0,0 +1,254 @@
+import os
+import time
+import random
+import hashlib
+import shutil
+import asyncio
+import argparse
+import tempfile
+import tracemalloc
+from datetime import datetime, timezone
+from blob_transfer import RequestCounter, download_blobs, download_ranges_to_file
+from benchmark import write_report
+
+
+class StandInError(Exception):
+    """A failed storage request, shaped like azure.core's HttpResponseError"""
+
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class StandInResponse:
+    """What a raw_response_hook reads from azure.core's PipelineResponse"""
+
+    def __init__(self, status_code):
+        self.http_response = self
+        self.status_code = status_code
+
+
+class StandInBlobProperties:
+    def __init__(self, name, size, etag, last_modified):
+        self.name = name
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+class StandInDownloader:
+    """The parts of StorageStreamDownloader the downloaders use"""
+
+    def __init__(self, service, data, properties):
+        self.service = service
+        self.data = data
+        self.size = len(data)
+        self.properties = properties
+
+    async def readall(self):
+        await self.service.transfer(len(self.data))
+        return self.data
+
+    async def chunks(self):
+        for offset in range(0, len(self.data), self.service.chunk_size):
+            chunk = self.data[offset:offset + self.service.chunk_size]
+            await self.service.transfer(len(chunk))
+            yield chunk
+
+
+class StandInBlobClient:
+    def __init__(self, service, name):
+        self.service = service
+        self.blob_name = name
+
+    async def exists(self):
+        await self.service.request('exists')
+        return self.blob_name in self.service.blobs
+
+    async def get_blob_properties(self):
+        await self.service.request('get_properties')
+        return self.service.properties(self.blob_name)
+
+    async def download_blob(self, offset=None, length=None, **options):
+        found = self.blob_name in self.service.blobs
+        await self.service.request('download', options.get('raw_response_hook'), 200 if found else 404)
+        data = self.service.blobs[self.blob_name]
+        if offset is not None:
+            data = data[offset:offset + length if length is not None else None]
+        return StandInDownloader(self.service, data, self.service.properties(self.blob_name))
+
+
+class StandInContainerClient:
+    """In-process stand-in for an async ContainerClient (an Azurite-like local emulator).
+
+    Each request waits `latency` seconds, each stream moves at most
+    `bandwidth` bytes per second, and a `failure_rate` share of downloads
+    fail with a 503 so retries are exercised. requests counts calls by kind.
+    """
+
+    def __init__(self, blobs, latency=0.02, bandwidth=50 * 1024 * 1024, failure_rate=0.0, seed=0,
+                 chunk_size=4 * 1024 * 1024):
+        self.blobs = blobs
+        self.chunk_size = chunk_size
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.requests = {}
+        self.modified = datetime.now(timezone.utc)
+
+    async def request(self, kind, response_hook=None, status_code=200):
+        self.requests[kind] = self.requests.get(kind, 0) + 1
+        await asyncio.sleep(self.latency)
+        if status_code == 200 and kind == 'download' and self.random.random() < self.failure_rate:
+            status_code = 503
+        if response_hook is not None:
+            response_hook(StandInResponse(status_code))
+        if status_code == 404:
+            raise StandInError("The specified blob does not exist.", status_code)
+        if status_code != 200:
+            raise StandInError("Server busy", status_code)
+
+    async def transfer(self, size):
+        if self.bandwidth:
+            await asyncio.sleep(size / self.bandwidth)
+
+    def properties(self, name):
+        if name not in self.blobs:
+            raise StandInError(f"The specified blob does not exist: {name}", 404)
+        return StandInBlobProperties(name, len(self.blobs[name]), f'"0x{hash(name) & 0xffffffff:08X}"', self.modified)
+
+    async def list_blobs(self, name_starts_with=None):
+        self.requests['list'] = self.requests.get('list', 0) + 1
+        await asyncio.sleep(self.latency)
+        for name in sorted(self.blobs):
+            if not name_starts_with or name.startswith(name_starts_with):
+                yield self.properties(name)
+
+    def get_blob_client(self, blob):
+        return StandInBlobClient(self, blob)
+
+
+def synthetic_blobs(count, size, prefix='bench/'):
+    payload = os.urandom(size)
+    return {f"{prefix}blob_{idx:05d}.bin": payload for idx in range(count)}
+
+
+async def benchmark_concurrency(blobs, concurrency, latency, bandwidth, failure_rate):
+    """Download every blob once at the given concurrency into a scratch directory"""
+    container_client = StandInContainerClient(blobs, latency, bandwidth, failure_rate)
+    counter = RequestCounter()
+    listed = [blob async for blob in container_client.list_blobs()]
+    download_dir = tempfile.mkdtemp(prefix='download_bench_')
+    try:
+        # Peak Python allocations during the downloads: chunks in flight, not blob sizes
+        tracemalloc.start()
+        start = time.perf_counter()
+        downloaded, failed = await download_blobs(
+            container_client, listed, download_dir, concurrency=concurrency, backoff=0.01, counter=counter
+        )
+        elapsed = time.perf_counter() - start
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        shutil.rmtree(download_dir, ignore_errors=True)
+    total_bytes = sum(len(blobs[entry['name']]) for entry in downloaded)
+    return {
+        "concurrency": concurrency,
+        "blobs": len(downloaded),
+        "failed": len(failed),
+        "seconds": round(elapsed, 3),
+        "blobs_per_sec": round(len(downloaded) / elapsed, 1),
+        "mib_per_sec": round(total_bytes / elapsed / (1024 * 1024), 1),
+        "peak_mib": round(peak_bytes / (1024 * 1024), 1),
+        "requests": dict(container_client.requests),
+        "counted": counter.summary(),
+    }
+
+
+async def benchmark_ranged(blobs, concurrency, latency, bandwidth, range_size, failure_rate=0.0):
+    """Download every blob as concurrent ranges with its SHA-256, one blob at a time.
+
+    Each downloaded file and its digest are checked against the source
+    blob, so injected failures and retried ranges cannot corrupt silently.
+    """
+    container_client = StandInContainerClient(blobs, latency, bandwidth, failure_rate)
+    download_dir = tempfile.mkdtemp(prefix='download_bench_')
+    try:
+        elapsed = 0.0
+        for name, data in blobs.items():
+            local_path = os.path.join(download_dir, os.path.basename(name))
+            file_hash, seconds = await download_ranges_to_file(
+                container_client.get_blob_client(name),
+                local_path,
+                len(data),
+                range_size=range_size,
+                concurrency=concurrency,
+                backoff=0.01
+            )
+            elapsed += seconds
+            # Verification is not part of the timed download
+            if file_hash != hashlib.sha256(data).hexdigest():
+                raise RuntimeError(f"SHA-256 of {name} does not match the source blob")
+            with open(local_path, 'rb') as downloaded:
+                if downloaded.read() != data:
+                    raise RuntimeError(f"Downloaded {name} differs from the source blob")
+    finally:
+        shutil.rmtree(download_dir, ignore_errors=True)
+    total_bytes = sum(len(data) for data in blobs.values())
+    return {
+        "concurrency": concurrency,
+        "range_size": range_size,
+        "blobs": len(blobs),
+        "verified": True,
+        "seconds": round(elapsed, 3),
+        "mib_per_sec": round(total_bytes / elapsed / (1024 * 1024), 1),
+        "requests": dict(container_client.requests),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark blob downloads against an in-process storage stand-in.")
+    parser.add_argument("--blobs", type=int, default=64, help="Number of blobs in the container")
+    parser.add_argument("--blob-size", type=int, default=1024 * 1024, help="Bytes per blob")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds of latency per storage request")
+    parser.add_argument("--bandwidth", type=float, default=50 * 1024 * 1024,
+                        help="Bytes per second of a single download stream (0 for unlimited)")
+    parser.add_argument("--failure-rate", type=float, default=0.0,
+                        help="Share of download requests (or ranges) that fail with a retryable 503")
+    parser.add_argument("--concurrency", type=int, nargs='+', default=[1, 2, 4, 8, 16],
+                        help="Concurrency levels to compare")
+    parser.add_argument("--range-size", type=int, default=None,
+                        help="Download each blob as concurrent ranges of this many bytes instead")
+    parser.add_argument("--report", type=str, help="Also write the results to this JSON report file")
+    args = parser.parse_args()
+
+    blobs = synthetic_blobs(args.blobs, args.blob_size)
+    print(f"\n=== Downloading {args.blobs} x {args.blob_size} bytes, "
+          f"{args.latency * 1000:.0f} ms latency per request ===\n")
+    results = []
+    for concurrency in args.concurrency:
+        if args.range_size:
+            result = asyncio.run(benchmark_ranged(
+                blobs, concurrency, args.latency, args.bandwidth, args.range_size, args.failure_rate
+            ))
+            results.append(result)
+            print(f"concurrency {concurrency:>3}: {result['seconds']:8.3f}s  "
+                  f"{result['mib_per_sec']:8.1f} MiB/s  verified  requests {result['requests']}")
+            continue
+        result = asyncio.run(benchmark_concurrency(
+            blobs, concurrency, args.latency, args.bandwidth, args.failure_rate
+        ))
+        results.append(result)
+        print(f"concurrency {concurrency:>3}: {result['seconds']:8.3f}s  "
+              f"{result['blobs_per_sec']:8.1f} blobs/s  {result['mib_per_sec']:8.1f} MiB/s  "
+              f"peak {result['peak_mib']:6.1f} MiB  "
+              f"{result['failed']} failed  requests {result['requests']}")
+
+    if args.report:
+        write_report(args.report, results, vars(args))
+        print(f"\nReport written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
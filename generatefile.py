@@ -1,7 +1,8 @@
-import json
 import os
 import uuid
 from openpyxl import load_workbook
+from manifest_writer import write_manifest
+from date_utils import format_iso_date
 from datetime import datetime
 
 # File paths (you may change these to suit your environment)
@@ -11,16 +12,6 @@ output_directory = '/path/to/output/json/files/'  # Update this with your desire
 if not os.path.exists(output_directory):
     os.makedirs(output_directory)
 
-# Helper function to format date to ISO 8601 format
-def format_iso_date(excel_date):
-    try:
-        if isinstance(excel_date, str):
-            if len(excel_date) == 7:  # Handling year-month format
-                excel_date += '-01'
-            return datetime.strptime(excel_date, "%Y-%m-%d").isoformat() + "-05:00"
-    except (ValueError, TypeError):
-        return None
-
 # Helper function to get file tag based on file extension
 def get_file_tag(file_name):
     ext = os.path.splitext(file_name)[1].lower()
@@ -38,9 +29,7 @@ wb = load_workbook(excel_file_path, data_only=True)
 
 # Helper function to write each record individually as one line in the file
 def write_records_to_file(output_file_path, records):
-    with open(output_file_path, 'w') as json_file:
-        for record in records:
-            json_file.write(json.dumps(record, separators=(',', ':')) + '\n')  # One record per line
+    write_manifest(output_file_path, records)  # One record per line
 
 # Process each sheet in the workbook
 for sheet_name in wb.sheetnames:
@@ -72,7 +61,7 @@ for sheet_name in wb.sheetnames:
         # Extract metadata from the row
         file_name = row[0]
         file_path = row[1]
-        record_date = format_iso_date(row[2])
+        record_date = format_iso_date(row[2], month_end=False)
         description = row[3]
         date_range = row[4]
         major_description = row[5]
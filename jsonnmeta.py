@@ -1,29 +1,14 @@
 import os
-import json
 import uuid
-import calendar
 from openpyxl import load_workbook
+from manifest_writer import write_manifest
+from date_utils import format_iso_date
 from datetime import datetime
 
 # Directory containing multiple Excel files
 input_directory = '/ark/landing_zone/exceltosjon/metadata_excel/'
 output_directory = '/ark/landing_zone/exceltosjon/metadata_json/'
 
-if not os.path.exists(output_directory):
-    os.makedirs(output_directory)
-
-# Helper function to format the date to the last day of the month (if month/year is provided)
-def format_iso_date(excel_date):
-    try:
-        if isinstance(excel_date, str):
-            if len(excel_date) == 7:  # Year-Month format (e.g., 2022-02)
-                year, month = excel_date.split('-')
-                last_day = calendar.monthrange(int(year), int(month))[1]  # Get last day of the month
-                excel_date = f"{year}-{month}-{last_day}"  # Construct the full date
-                return datetime.strptime(excel_date, "%Y-%m-%d").isoformat() + "-05:00"
-    except (ValueError, TypeError):
-        return None
-
 # Helper function to get file tag based on file extension
 def get_file_tag(file_name):
     ext = os.path.splitext(file_name)[1].lower()
@@ -34,9 +19,7 @@ def get_file_tag(file_name):
 
 # Helper function to write records to JSON file
 def write_records_to_file(output_file_path, records):
-    with open(output_file_path, 'w') as json_file:
-        for record in records:
-            json_file.write(json.dumps(record, separators=(',', ':')) + '\n')
+    write_manifest(output_file_path, records)
 
 # Function to process each Excel file in the directory
 def process_excel_file(file_path):
@@ -158,6 +141,8 @@ def process_excel_file(file_path):
 
 # Function to process files in a directory
 def process_directory(directory_path):
+    if not os.path.exists(output_directory):
+        os.makedirs(output_directory)
     excel_files = [f for f in os.listdir(directory_path) if f.endswith('.xlsx')]
     if not excel_files:
         print("No Excel files found in the input directory.")
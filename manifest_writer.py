@@ -0,0 +1,215 @@
+import os
+import json
+import uuid
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# One encoder for every record; json.dumps with custom separators builds a new one per call
+_ENCODER = json.JSONEncoder(separators=(',', ':'))
+
+# JSON text of a single value, exactly as it appears inside json.dumps output
+encode_json = _ENCODER.encode
+
+# Leaf types orjson renders exactly like json.dumps (floats and datetimes differ)
+_ORJSON_SAFE_TYPES = frozenset((str, int, bool, type(None)))
+
+
+def _orjson_compatible(record):
+    """Check that orjson output for a record would match the stdlib encoder"""
+    for value in record.values():
+        if type(value) is dict:
+            for leaf in value.values():
+                if type(leaf) not in _ORJSON_SAFE_TYPES:
+                    return False
+        elif type(value) not in _ORJSON_SAFE_TYPES:
+            return False
+    return True
+
+
+def _serialize_orjson(records):
+    """Serialize with orjson, or return None when the bytes would differ from json.dumps"""
+    try:
+        data = b'\n'.join(map(orjson.dumps, records))
+    except orjson.JSONEncodeError:
+        return None
+    # json.dumps escapes everything outside ' '..'~' (ensure_ascii); orjson emits UTF-8 and DEL as-is
+    if not data.isascii() or b'\x7f' in data:
+        return None
+    return data + b'\n'
+
+
+def serialize_records(records, fast=True):
+    """Serialize records as JSON lines in one pass.
+
+    Returns the manifest bytes and the dz_file_name of every upload_new_file
+    operation, collected while serializing. The bytes are identical to
+    writing json.dumps(record, separators=(',', ':')) + '\n' per record;
+    orjson is used when installed and its output would be the same.
+    """
+    if not records:
+        return b'', []
+
+    upload_files = []
+    if fast and orjson is not None:
+        compatible = True
+        for record in records:
+            if record['operation'] == 'upload_new_file':
+                upload_files.append(record['file_metadata']['dz_file_name'])
+            if compatible and not _orjson_compatible(record):
+                compatible = False
+        if compatible:
+            data = _serialize_orjson(records)
+            if data is not None:
+                return data, upload_files
+        upload_files = []
+
+    encode = _ENCODER.encode
+    lines = []
+    for record in records:
+        lines.append(encode(record))
+        if record['operation'] == 'upload_new_file':
+            upload_files.append(record['file_metadata']['dz_file_name'])
+    lines.append('')
+    return '\n'.join(lines).encode('ascii'), upload_files
+
+
+def staging_path(output_file_path):
+    """Hidden temporary name next to a manifest; consumers only pick up *.a360.
+
+    Unique per writer, so concurrent conversions producing the same
+    manifest name never share (and truncate) one temporary file.
+    """
+    directory, name = os.path.split(output_file_path)
+    return os.path.join(directory, f".{name}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+
+
+def encode_lines(lines):
+    """Bytes of a manifest made of already serialized JSON lines"""
+    return ''.join(line + '\n' for line in lines).encode('ascii')
+
+
+def write_atomic(output_file_path, data):
+    """Write bytes under a temporary name and rename them into place"""
+    temp_path = staging_path(output_file_path)
+    with open(temp_path, 'wb') as manifest_file:
+        manifest_file.write(data)
+    os.replace(temp_path, output_file_path)
+
+
+def _fdatasync_file(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        # fdatasync skips the metadata-only flush where the platform has it
+        getattr(os, 'fdatasync', os.fsync)(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_directory(directory):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        # Directories cannot be opened on every platform
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_manifest(output_file_path, records, fast=True):
+    """Write a manifest file with a single write call; returns the uploaded file names.
+
+    The file is written under a temporary name and renamed into place, so
+    readers never see a partial manifest.
+    """
+    data, upload_files = serialize_records(records, fast)
+    write_atomic(output_file_path, data)
+    return upload_files
+
+
+def write_manifest_lines(output_file_path, lines):
+    """Write already serialized JSON lines with a single write call, atomically"""
+    write_atomic(output_file_path, encode_lines(lines))
+
+
+class ManifestBatch:
+    """Stage manifest files under temporary names and publish them together.
+
+    Nothing written through the batch is visible under its final name until
+    publish(). With durable=True, publish() fdatasyncs each staged file,
+    renames every file into place with os.replace, then fsyncs each output
+    directory once so the renames survive a crash too. That is one sync
+    per file plus one per directory, not one per batch: os.sync() would
+    flush every mounted filesystem (including the NFS landing zone), and
+    syncfs(), which limits that to one filesystem, is Linux-only and not
+    in the os module, so per-file syncs are the portable way to make just
+    this batch durable. Used as a
+    context manager, the batch is published on success and its temporary
+    files are removed on error.
+    """
+
+    def __init__(self, durable=True):
+        self.durable = durable
+        # (temporary path, final path) in publishing order
+        self.staged = []
+
+    def write(self, output_file_path, data):
+        temp_path = staging_path(output_file_path)
+        # Staged before writing, so abort() also removes a file whose write failed
+        self.staged.append((temp_path, output_file_path))
+        with open(temp_path, 'wb') as manifest_file:
+            manifest_file.write(data)
+
+    def write_records(self, output_file_path, records, fast=True):
+        """Stage a manifest of records; returns the uploaded file names"""
+        data, upload_files = serialize_records(records, fast)
+        self.write(output_file_path, data)
+        return upload_files
+
+    def write_lines(self, output_file_path, lines):
+        self.write(output_file_path, encode_lines(lines))
+
+    def stage(self, temp_path, output_file_path):
+        """Publish a file that was already written under a temporary name"""
+        self.staged.append((temp_path, output_file_path))
+
+    def publish(self):
+        """Move every staged file into place; returns the number of files published"""
+        if not self.staged:
+            return 0
+        if self.durable:
+            for temp_path, _ in self.staged:
+                _fdatasync_file(temp_path)
+        directories = set()
+        for temp_path, output_file_path in self.staged:
+            os.replace(temp_path, output_file_path)
+            directories.add(os.path.dirname(output_file_path) or '.')
+        if self.durable:
+            for directory in directories:
+                _fsync_directory(directory)
+        published = len(self.staged)
+        self.staged = []
+        return published
+
+    def abort(self):
+        """Remove staged files without publishing them"""
+        for temp_path, _ in self.staged:
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+        self.staged = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.publish()
+        else:
+            self.abort()
+        return False
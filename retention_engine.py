@@ -0,0 +1,253 @@
+import os
+import re
+import sys
+import json
+import argparse
+import numpy as np
+import pandas as pd
+
+# Retention rules of every schedule; see RetentionRules for the format
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'retention_rules.json')
+RULES_VERSION = 1
+
+# Periods retained from the record date; everything else runs from an event
+RECORD_DATE_PERIODS = ['PERM', 'IND', 'LI', 'Life of Corporation']
+
+# Class codes that mark China operations classes in the class name
+CHINA_OPERATIONS_CLASSES = ['ACC205', 'ACC305', 'ADM165', 'AUD165', 'TAX125']
+
+
+def rule_days(rule):
+    """Days of a rule value: {"days": n} or {"years": n}"""
+    if 'days' in rule:
+        return rule['days']
+    return rule['years'] * 365
+
+
+class RetentionRules:
+    """The retention rules of one schedule, compiled for lookup.
+
+    Rules are tried in order: the exact class code (codes), the exact
+    Retention Period text (periods), then each pattern in turn, where a
+    regex must match the whole text and its first group counts
+    days_per_unit. numeric_days_per_unit converts numeric cells the way
+    int() would, or leaves them unreadable when null. examples list
+    (code, period, days) cases that check() verifies.
+    """
+
+    def __init__(self, spec, name=None, version=None):
+        self.name = name
+        self.version = version
+        self.codes = {code: rule_days(rule) for code, rule in spec.get('codes', {}).items()}
+        self.periods = {period: rule_days(rule) for period, rule in spec.get('periods', {}).items()}
+        self.patterns = [
+            (
+                pattern.get('name', pattern['regex']),
+                re.compile(rf"\A(?:{pattern['regex']})\Z", re.IGNORECASE if pattern.get('ignore_case') else 0),
+                pattern['days_per_unit'],
+            )
+            for pattern in spec.get('patterns', [])
+        ]
+        self.numeric_days_per_unit = spec.get('numeric_days_per_unit')
+        self.examples = spec.get('examples', [])
+
+    def match(self, code, period):
+        """(days, rule) for one row; (None, None) if no rule reads the period"""
+        if code in self.codes:
+            return self.codes[code], f"code {code}"
+        if isinstance(period, str):
+            if period in self.periods:
+                return self.periods[period], f"period {period}"
+            for name, regex, days_per_unit in self.patterns:
+                match = regex.match(period)
+                if match:
+                    return int(match.group(1)) * days_per_unit, f"pattern {name}"
+        elif self.numeric_days_per_unit and isinstance(period, (int, float)) and period == period:
+            return int(period) * self.numeric_days_per_unit, 'numeric'
+        return None, None
+
+    def days(self, code, period):
+        return self.match(code, period)[0]
+
+    def days_column(self, period, codes=None):
+        """Days per row as floats (NaN where no rule applies), a rule at a time"""
+        days = np.full(len(period), np.nan)
+        if codes is not None and self.codes:
+            days = codes.map(self.codes).to_numpy(dtype=float, na_value=np.nan, copy=True)
+        unmatched = np.isnan(days)
+        if self.periods:
+            days[unmatched] = period[unmatched].map(self.periods).to_numpy(dtype=float, na_value=np.nan)
+
+        is_text = (period.map(type) == str).to_numpy()
+        for _, regex, days_per_unit in self.patterns:
+            rows = np.flatnonzero(is_text & np.isnan(days))
+            if not len(rows):
+                break
+            counts = period.iloc[rows].astype(str).str.extract(regex.pattern, flags=regex.flags)[0]
+            matched = counts.notna().to_numpy()
+            days[rows[matched]] = pd.to_numeric(counts[matched]).to_numpy(dtype=float) * days_per_unit
+
+        if self.numeric_days_per_unit:
+            rows = np.flatnonzero(~is_text & np.isnan(days))
+            # int() truncates numeric cells
+            numbers = pd.to_numeric(period.iloc[rows], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            days[rows] = np.trunc(numbers) * self.numeric_days_per_unit
+        return pd.Series(days, index=period.index)
+
+    def check(self):
+        """Failures of the examples, plus rules no example exercises"""
+        failures = []
+        used = set()
+        for example in self.examples:
+            code, period, expected = example.get('code'), example.get('period'), example['days']
+            days, rule = self.match(code, period)
+            column = self.days_column(
+                pd.Series([period], dtype=object), pd.Series([code], dtype=object)
+            )[0]
+            column = None if column != column else int(column)
+            if days != expected or column != expected:
+                failures.append(f"{code!r}, {period!r}: expected {expected}, got {days} (column {column})")
+            used.add(rule)
+        rules = (
+            [f"code {code}" for code in self.codes]
+            + [f"period {period}" for period in self.periods]
+            + [f"pattern {name}" for name, _, _ in self.patterns]
+        )
+        failures.extend(f"no example for {rule}" for rule in rules if rule not in used)
+        return failures
+
+
+def load_rules(schedule, path=None):
+    """Compile one schedule of a rule file (RULES_FILE by default)"""
+    path = path or RULES_FILE
+    with open(path, 'r') as f:
+        spec = json.load(f)
+    if spec.get('version') != RULES_VERSION:
+        raise ValueError(f"{path}: rule file version {spec.get('version')!r}, expected {RULES_VERSION}")
+    if schedule not in spec['schedules']:
+        raise ValueError(f"{path}: no {schedule!r} schedule; have {', '.join(spec['schedules'])}")
+    return RetentionRules(spec['schedules'][schedule], name=schedule, version=spec['version'])
+
+
+def excluded_rows(df, name_column, china_classes=CHINA_OPERATIONS_CLASSES):
+    """Rows left out of the export: periods in days or months, plain ACT, China operations"""
+    period = df['Retention Period']
+    period_text = period.map(str).str.lower()
+    china = '|'.join(re.escape(code) for code in china_classes)
+    return (
+        period_text.str.contains('days', regex=False)
+        | period_text.str.contains('months', regex=False)
+        | (period == 'ACT')
+        | df[name_column].map(str).str.contains(china)
+    )
+
+
+def trigger_fields(period, listed_periods=RECORD_DATE_PERIODS, listed='RecordDate', other='EventDate'):
+    """Retention trigger field per row: `listed` for the given periods, `other` for the rest"""
+    return period.isin(listed_periods).map({True: listed, False: other})
+
+
+def text_column(series):
+    """Column values for JSON, with empty cells as ''"""
+    return series.astype(object).where(series.notna(), '').tolist()
+
+
+def optional_days(days):
+    """Floats with NaN to ints with None"""
+    return [None if value != value else int(value) for value in days.tolist()]
+
+
+def build_records(columns):
+    """One dict per row from {key: values} in key order; a fresh exceptions list each"""
+    keys = list(columns)
+    records = [dict(zip(keys, values)) for values in zip(*columns.values())]
+    for record in records:
+        record['jurisdictional_exceptions'] = []
+    return records
+
+
+def convert_record_classes(df, fields, name_column='Record Class Name', skip_unparsed=False,
+                           retention_type='YearEnd', trigger=None, rules=None):
+    """Convert the Record Classes sheet into retention schedule records.
+
+    fields maps output keys to sheet columns and comes first in each
+    record, followed by retention_period, retention_trigger_field and
+    retention_type. With retention_type=None the key is only added (last)
+    for rows whose own retention_type column says YearEnd. trigger
+    overrides the keyword arguments of trigger_fields. Rows whose period
+    cannot be read get a null retention_period, or are dropped with
+    skip_unparsed. rules defaults to the rrs schedule of RULES_FILE.
+    """
+    rules = rules or load_rules('rrs')
+    df = df[~excluded_rows(df, name_column)]
+    days = rules.days_column(df['Retention Period'], df['Record Class Code'])
+    if skip_unparsed:
+        df = df[days.notna()]
+        days = days[days.notna()]
+
+    columns = {key: text_column(df[column]) for key, column in fields.items()}
+    columns['retention_period'] = optional_days(days)
+    columns['retention_trigger_field'] = trigger_fields(df['Retention Period'], **(trigger or {})).tolist()
+    if retention_type is not None:
+        columns['retention_type'] = [retention_type] * len(df)
+    records = build_records(columns)
+
+    if retention_type is None and 'retention_type' in df.columns:
+        year_end = (df['retention_type'] == 'YearEnd').tolist()
+        for record, is_year_end in zip(records, year_end):
+            if is_year_end:
+                record['retention_type'] = 'YearEnd'
+    return records
+
+
+def convert_text_periods(df, rules=None):
+    """Convert the M Edits sheet, whose periods are free text, into retention schedule records.
+
+    rules defaults to the text schedule of RULES_FILE.
+    """
+    rules = rules or load_rules('text')
+    df = df[
+        ~df['Record Class Name'].str.contains('China Operations', na=False)
+        & ~df['Retention Period'].str.contains('ACT', na=False)
+        & ~df['Retention Period'].str.contains('day', case=False, na=False)
+    ]
+    days = rules.days_column(df['Retention Period'])
+    df = df[days.notna()]
+    days = days[days.notna()]
+
+    period = df['Retention Period']
+    mentions_unit = (
+        period.str.contains('year', regex=False, na=False)
+        | period.str.contains('month', regex=False, na=False)
+    )
+    columns = {
+        'record_class_code': df['Record Class Code'].tolist(),
+        'record_class_name': df['Record Class Name M Edit'].tolist(),
+        'record_class_description': df['Record Class Description M Edits'].tolist(),
+        'retention_period': optional_days(days),
+        'retention_trigger_field': mentions_unit.map({True: 'RecordDate', False: 'EventDate'}).tolist(),
+        'retention_type': ['YearEnd'] * len(df),
+    }
+    return build_records(columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check every schedule of a retention rule file against its examples.")
+    parser.add_argument("rules_file", nargs='?', default=RULES_FILE, help="Rule file (default: retention_rules.json)")
+    args = parser.parse_args()
+
+    with open(args.rules_file, 'r') as f:
+        schedules = json.load(f)['schedules']
+    failed = False
+    for schedule in schedules:
+        rules = load_rules(schedule, args.rules_file)
+        failures = rules.check()
+        print(f"{schedule}: {len(rules.examples)} example(s), {len(failures)} failure(s)")
+        for failure in failures:
+            print(f"  {failure}")
+        failed = failed or bool(failures)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
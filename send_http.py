@@ -1,9 +1,10 @@
 import os
-import hashlib
 import json
 import azure.functions as func
-from azure.storage.blob import BlobServiceClient, BlobClient
+from azure.core import MatchConditions
+from azure.storage.blob.aio import BlobServiceClient
 from datetime import datetime, timedelta
+from blob_transfer import RANGE_CONCURRENCY, download_ranges_to_file, transfer_rate
 
 async def main(req: func.HttpRequest) -> func.HttpResponse:
     try:
@@ -12,55 +13,40 @@ async def main(req: func.HttpRequest) -> func.HttpResponse:
         blob_name = req.params.get("filepath")
         chunk_size = 100 * 1024 * 1024  # 100 MB
 
-        # Initialize BlobServiceClient with the hardcoded connection string
-        blob_service_client = BlobServiceClient.from_connection_string(
+        # Initialize BlobServiceClient with the hardcoded connection string; closing it releases the aiohttp session
+        async with BlobServiceClient.from_connection_string(
             "DefaultEndpointsProtocol=https;AccountName=<your-account-name>;AccountKey=<your-account-key>;EndpointSuffix=core.windows.net"
-        )
-        blob_client = blob_service_client.get_blob_client(container=container_name, blob=blob_name)
-
-        # Download and chunk the file
-        blob_size = (await blob_client.get_blob_properties()).size
-        file_parts = []
-        part_number = 0
-
-        # Create a temp file path for chunks
-        temp_dir = "/tmp"
-        temp_file_path = os.path.join(temp_dir, blob_name)
-
-        # Download in chunks and store parts temporarily
-        for start_byte in range(0, blob_size, chunk_size):
-            end_byte = min(start_byte + chunk_size - 1, blob_size - 1)
-            range_header = f"bytes={start_byte}-{end_byte}"
-
-            # Download the chunk
-            stream = await blob_client.download_blob(offset=start_byte, length=(end_byte - start_byte + 1))
-            part_path = f"{temp_file_path}.part{part_number}"
-            with open(part_path, "wb") as chunk_file:
-                chunk_file.write(await stream.readall())
-
-            file_parts.append(part_path)
-            part_number += 1
-
-        # Merge chunks into a single file
-        merged_file_path = f"{temp_file_path}_merged"
-        with open(merged_file_path, "wb") as merged_file:
-            for part_path in file_parts:
-                with open(part_path, "rb") as chunk_file:
-                    merged_file.write(chunk_file.read())
-                os.remove(part_path)  # Clean up chunk files after merging
-
-        # Hash Validation
-        sha256_hash = hashlib.sha256()
-        with open(merged_file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        file_hash = sha256_hash.hexdigest()
+        ) as blob_service_client:
+            blob_client = blob_service_client.get_blob_client(container=container_name, blob=blob_name)
+
+            # Fetch 100 MB ranges concurrently into one file, hashing them in order as they land
+            properties = await blob_client.get_blob_properties()
+            blob_size = properties.size
+            concurrency = int(req.params.get("concurrency") or RANGE_CONCURRENCY)
+
+            temp_dir = "/tmp"
+            temp_file_path = os.path.join(temp_dir, blob_name)
+            merged_file_path = f"{temp_file_path}_merged"
+            os.makedirs(os.path.dirname(merged_file_path), exist_ok=True)
+
+            # Every range must come from the version whose size was read above
+            file_hash, seconds = await download_ranges_to_file(
+                blob_client,
+                merged_file_path,
+                blob_size,
+                range_size=chunk_size,
+                concurrency=concurrency,
+                etag=properties.etag,
+                match_condition=MatchConditions.IfNotModified
+            )
 
         # Return the final file path and hash
         response = {
             "status": "success",
             "file_path": merged_file_path,
-            "file_hash": file_hash
+            "file_hash": file_hash,
+            "size": blob_size,
+            "bytes_per_sec": transfer_rate(blob_size, seconds)
         }
         return func.HttpResponse(json.dumps(response), status_code=200, mimetype="application/json")
 
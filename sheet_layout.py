@@ -0,0 +1,179 @@
+import os
+import json
+from operator import itemgetter
+from openpyxl.utils.cell import column_index_from_string, coordinate_to_tuple
+from date_utils import format_iso_date
+
+# Header fields every layout must place, and the order data rows are extracted in
+HEADER_FIELDS = (
+    'publisher', 'creator', 'cost_center', 'provenance', 'contributor',
+    'security_classification', 'region', 'record_class'
+)
+ROW_FIELDS = (
+    'file_name', 'file_path', 'record_code', 'record_date', 'description',
+    'date_range', 'major_description', 'minor_description', 'reference_1'
+)
+
+# Extension -> tag table of the 'mapped' file_tag transform (as in jsonnmeta.py)
+FILE_TAG_MAP = {
+    '.doc': 'word', '.pdf': 'pdf', '.zip': 'zip', '.jpg': 'image', '.jpeg': 'image',
+    '.png': 'image', '.csv': 'csv', '.txt': 'text', '.xlsx': 'excel'
+}
+
+DEFAULT_TRANSFORMS = {
+    # 'extension': bare file extension; 'mapped': FILE_TAG_MAP lookup
+    'file_tag': 'extension',
+    # 'YYYY-MM' record dates resolve to the last (True) or first (False) day
+    'month_end': True,
+    # 'numeric': zero-pad numbers and strip strings; 'always': zero-pad everything
+    'cost_center': 'numeric',
+    # Read numeric record dates as Excel serials; off, they give None like any unparsed value
+    'serial_dates': False,
+}
+
+BUILTIN_LAYOUTS = {
+    # arg_path_log.py / arg.py
+    'default': {
+        'sheet_prefix': 'Metadata',
+        'header_cells': {
+            'publisher': 'B1', 'creator': 'B2', 'cost_center': 'B3', 'provenance': 'D1',
+            'contributor': 'D2', 'security_classification': 'D4', 'region': 'R4',
+            'record_class': 'C9'
+        },
+        'data_start_row': 9,
+        'columns': {
+            'file_name': 'A', 'file_path': 'B', 'record_code': 'C', 'record_date': 'D',
+            'description': 'E', 'date_range': 'F', 'major_description': 'G',
+            'minor_description': 'H', 'reference_1': 'I'
+        },
+        'transforms': {},
+    },
+    # Cells of jsonnmeta.py workbooks (region in B4) with mapped file tags
+    'region_b4': {
+        'sheet_prefix': 'Metadata',
+        'header_cells': {
+            'publisher': 'B1', 'creator': 'B2', 'cost_center': 'B3', 'provenance': 'D1',
+            'contributor': 'D2', 'security_classification': 'D4', 'region': 'B4',
+            'record_class': 'C9'
+        },
+        'data_start_row': 9,
+        'columns': {
+            'file_name': 'A', 'file_path': 'B', 'record_code': 'C', 'record_date': 'D',
+            'description': 'E', 'date_range': 'F', 'major_description': 'G',
+            'minor_description': 'H', 'reference_1': 'I'
+        },
+        'transforms': {'file_tag': 'mapped'},
+    },
+    # Cells of generatefile_2.py workbooks: every sheet, record class in C7, dates in F, shifted columns
+    'all_sheets_shifted': {
+        'sheet_prefix': '',
+        'header_cells': {
+            'publisher': 'B1', 'creator': 'B2', 'cost_center': 'B3', 'provenance': 'D1',
+            'contributor': 'D2', 'security_classification': 'D4', 'region': 'B4',
+            'record_class': 'C7'
+        },
+        'data_start_row': 9,
+        'columns': {
+            'file_name': 'A', 'file_path': 'B', 'record_code': 'C', 'record_date': 'F',
+            'description': 'E', 'date_range': 'G', 'major_description': 'H',
+            'minor_description': 'I', 'reference_1': 'J'
+        },
+        'transforms': {'file_tag': 'mapped', 'cost_center': 'always'},
+    },
+}
+
+
+class SheetLayout:
+    """Where a workbook variant keeps its header cells and data columns.
+
+    The declarative spec is compiled once: header cells become (row, column)
+    offsets into a single read of the top rows, and the column mapping
+    becomes an itemgetter that returns data rows in ROW_FIELDS order, so the
+    converter's row loop never looks fields up by name.
+
+    A layout only says where values are read. Record keys and manifest
+    file names are always ExcelProcessor's, so region_b4 and
+    all_sheets_shifted read those scripts' workbooks but do not reproduce
+    the scripts' output.
+    """
+
+    def __init__(self, spec, name=None):
+        self.spec = spec
+        self.name = name or spec.get('name', 'custom')
+        self.sheet_prefix = spec.get('sheet_prefix', 'Metadata')
+        self.data_start_row = spec['data_start_row']
+
+        header_cells = spec['header_cells']
+        missing = [field for field in HEADER_FIELDS if field not in header_cells]
+        if missing:
+            raise ValueError(f"Layout {self.name} is missing header cells for: {', '.join(missing)}")
+        self.header_positions = {
+            field: coordinate_to_tuple(address) for field, address in header_cells.items()
+        }
+        self.header_max_row = max(row for row, _ in self.header_positions.values())
+        self.header_max_col = max(col for _, col in self.header_positions.values())
+
+        columns = spec['columns']
+        missing = [field for field in ROW_FIELDS if field not in columns]
+        if missing:
+            raise ValueError(f"Layout {self.name} is missing columns for: {', '.join(missing)}")
+        indexes = [column_index_from_string(columns[field]) - 1 for field in ROW_FIELDS]
+        self.data_max_col = max(indexes) + 1
+        self.column_indexes = indexes
+        self.extract_row = itemgetter(*indexes)
+
+        self.transforms = dict(DEFAULT_TRANSFORMS, **spec.get('transforms', {}))
+
+    def read_header(self, header_rows):
+        """Map header fields to values from the rows read off the top of a sheet"""
+        header = {}
+        for field, (row_idx, col_idx) in self.header_positions.items():
+            try:
+                header[field] = header_rows[row_idx - 1][col_idx - 1]
+            except IndexError:
+                header[field] = None
+        return header
+
+    def record_date(self, value):
+        return format_iso_date(value, self.transforms['month_end'], self.transforms['serial_dates'])
+
+    def file_tag(self, file_name):
+        if self.transforms['file_tag'] == 'mapped':
+            return FILE_TAG_MAP.get(os.path.splitext(file_name)[1].lower(), 'unknown')
+        ext = os.path.splitext(file_name)[1]
+        if not ext:
+            ext = file_name.split(".")[-1]
+        else:
+            ext = ext[1:]
+        return ext
+
+    def file_tag_column(self, names):
+        """file_tag() for a pandas Series of file names, as a list"""
+        import pandas as pd
+
+        if self.transforms['file_tag'] == 'extension' and pd.api.types.infer_dtype(names, skipna=False) == 'string':
+            # Text after the last dot, or the whole name; the same as file_tag() for any str
+            return names.str.rpartition('.')[2].tolist()
+        return [self.file_tag(name) for name in names.tolist()]
+
+    def cost_center(self, value):
+        if self.transforms['cost_center'] == 'always':
+            return str(value).zfill(12)
+        return str(value).zfill(12) if isinstance(value, (int, float)) else value.strip()
+
+
+def load_layout(layout):
+    """Resolve a built-in layout name, a JSON layout file path or a spec dict"""
+    if isinstance(layout, SheetLayout):
+        return layout
+    if isinstance(layout, dict):
+        return SheetLayout(layout)
+    if layout in BUILTIN_LAYOUTS:
+        return SheetLayout(BUILTIN_LAYOUTS[layout], name=layout)
+    if os.path.isfile(layout):
+        with open(layout, 'r') as f:
+            spec = json.load(f)
+        return SheetLayout(spec, name=spec.get('name', os.path.splitext(os.path.basename(layout))[0]))
+    raise ValueError(
+        f"Unknown layout {layout!r}; use one of {', '.join(BUILTIN_LAYOUTS)} or a JSON layout file"
+    )
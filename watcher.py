@@ -0,0 +1,291 @@
+import os
+import json
+import time
+import logging
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:
+    INotify = None
+
+logger = logging.getLogger('ExcelWatcher')
+
+
+class DirectoryWatcher:
+    """Watch a landing directory and convert each new workbook once.
+
+    Arrivals come from inotify when inotify_simple is installed, and from a
+    directory scan every poll_interval seconds otherwise. A file is only
+    dispatched after its size and mtime have stayed the same for
+    settle_seconds, so copies still in progress are not picked up. With
+    ready_marker (e.g. '.done'), producers signal completion instead: a
+    file is dispatched once `<name><ready_marker>` exists, however long
+    its copy stalls. The processed set lives in memory, seeded once from
+    processed_log; the convert callable is expected to record its own
+    completions there. Conversions run in a pool of at most `workers`
+    processes.
+    """
+
+    # Full rescan interval under inotify, in case the event queue overflowed
+    RESCAN_INTERVAL = 60.0
+    LATENCY_WINDOW = 1000
+
+    def __init__(self, directory, output_directory, convert, processed_log=None,
+                 workers=2, settle_seconds=2.0, poll_interval=5.0, suffix='.xlsx',
+                 metrics_file=None, metrics_interval=30.0, use_inotify=True, ready_marker=None):
+        self.directory = os.path.abspath(directory)
+        self.output_directory = output_directory
+        self.convert = convert
+        self.workers = workers
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.suffix = suffix
+        self.metrics_file = metrics_file
+        self.metrics_interval = metrics_interval
+        self.use_inotify = use_inotify and INotify is not None
+        self.ready_marker = ready_marker
+
+        self.processed = self._load_processed(processed_log)
+        # path -> [size, mtime_ns, arrived_at, unchanged_since]
+        self.settling = {}
+        # (path, arrived_at) of settled files waiting for a worker
+        self.pending = deque()
+        # future -> (path, arrived_at, file signature)
+        self.in_flight = {}
+        # path -> (size, mtime_ns) of the version that failed; retried once it changes
+        self.failed = {}
+        self.latencies = deque(maxlen=self.LATENCY_WINDOW)
+        self.converted_count = 0
+        self.failed_count = 0
+
+    @staticmethod
+    def _load_processed(processed_log):
+        """Read the processed-files log once; entries may be full paths or bare names"""
+        if not processed_log or not os.path.exists(processed_log):
+            return set()
+        with open(processed_log, 'r') as log_file:
+            return set(log_file.read().splitlines())
+
+    def is_processed(self, path):
+        return path in self.processed or os.path.basename(path) in self.processed
+
+    def _wanted(self, name):
+        # Skip hidden files and Excel's ~$ lock files
+        return name.endswith(self.suffix) and not name.startswith(('.', '~$'))
+
+    def note_arrival(self, path, now):
+        """Start settling a file the first time it is seen"""
+        if path in self.settling or self.is_processed(path):
+            return
+        if any(path == pending_path for pending_path, _ in self.pending):
+            return
+        if any(path == in_flight[0] for in_flight in self.in_flight.values()):
+            return
+        if path in self.failed:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                return
+            if self.failed[path] == (stat.st_size, stat.st_mtime_ns):
+                return
+        self.settling[path] = [None, None, now, now]
+
+    def scan(self, now):
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if self._wanted(entry.name) and entry.is_file():
+                    self.note_arrival(entry.path, now)
+
+    def check_settled(self, now):
+        """Move files whose upload is complete to the dispatch queue"""
+        for path, state in list(self.settling.items()):
+            if self.ready_marker:
+                if os.path.exists(path + self.ready_marker):
+                    del self.settling[path]
+                    self.pending.append((path, state[2]))
+                elif not os.path.exists(path):
+                    del self.settling[path]
+                continue
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                # Renamed or removed before it settled
+                del self.settling[path]
+                continue
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if signature != (state[0], state[1]):
+                state[0], state[1], state[3] = stat.st_size, stat.st_mtime_ns, now
+                continue
+            if now - state[3] < self.settle_seconds:
+                continue
+            del self.settling[path]
+            self.pending.append((path, state[2]))
+
+    def dispatch(self, executor):
+        while self.pending and len(self.in_flight) < self.workers:
+            path, arrived_at = self.pending.popleft()
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            logger.info(f"Processing new file: {path}")
+            future = executor.submit(self.convert, path, self.output_directory)
+            self.in_flight[future] = (path, arrived_at, (stat.st_size, stat.st_mtime_ns))
+
+    def reap(self):
+        """Collect finished conversions and record their arrival-to-manifest latency"""
+        for future in [future for future in self.in_flight if future.done()]:
+            path, arrived_at, signature = self.in_flight.pop(future)
+            try:
+                future.result()
+            except Exception as e:
+                self.failed_count += 1
+                self.failed[path] = signature
+                logger.error(f"Conversion failed for {path}: {e}")
+                continue
+            latency = time.monotonic() - arrived_at
+            self.latencies.append(latency)
+            self.converted_count += 1
+            self.failed.pop(path, None)
+            self.processed.add(path)
+            logger.info(f"Converted {path} in {latency:.2f}s from arrival")
+
+    def metrics(self):
+        """Queue depth and arrival-to-manifest latency over the recent conversions"""
+        latencies = sorted(self.latencies)
+
+        def percentile(fraction):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))], 3)
+
+        return {
+            'settling': len(self.settling),
+            'queue_depth': len(self.pending),
+            'in_flight': len(self.in_flight),
+            'converted': self.converted_count,
+            'failed': self.failed_count,
+            'latency_p50_seconds': percentile(0.5),
+            'latency_p95_seconds': percentile(0.95),
+            'latency_max_seconds': round(latencies[-1], 3) if latencies else None,
+        }
+
+    def publish_metrics(self):
+        metrics = self.metrics()
+        p95 = metrics['latency_p95_seconds']
+        logger.info(
+            "Watcher: {settling} settling, {queue_depth} queued, {in_flight} in flight, "
+            "{converted} converted, {failed} failed, ".format(**metrics)
+            + (f"p95 latency {p95}s" if p95 is not None else "no latency data yet")
+        )
+        if self.metrics_file:
+            temp_path = self.metrics_file + '.tmp'
+            with open(temp_path, 'w') as f:
+                json.dump(dict(metrics, updated_at=time.time()), f)
+            os.replace(temp_path, self.metrics_file)
+
+    def _open_inotify(self):
+        inotify = INotify()
+        watch_flags = (inotify_flags.CREATE | inotify_flags.MODIFY
+                       | inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO)
+        inotify.add_watch(self.directory, watch_flags)
+        return inotify
+
+    def wait_for_events(self, inotify, timeout):
+        """Block up to timeout seconds; returns False if a full rescan is needed"""
+        if inotify is None:
+            time.sleep(timeout)
+            return True
+        now = time.monotonic()
+        for event in inotify.read(timeout=int(timeout * 1000)):
+            if event.mask & inotify_flags.Q_OVERFLOW:
+                return False
+            if self._wanted(event.name):
+                self.note_arrival(os.path.join(self.directory, event.name), now)
+        return True
+
+    def run(self, stop_after=None):
+        """Watch until interrupted, or for stop_after seconds"""
+        logger.info(
+            f"Watching directory: {self.directory} for new Excel files "
+            f"({'inotify' if self.use_inotify else 'polling every %ss' % self.poll_interval})..."
+        )
+        inotify = self._open_inotify() if self.use_inotify else None
+        scan_interval = self.RESCAN_INTERVAL if inotify is not None else self.poll_interval
+        started = last_scan = last_metrics = time.monotonic()
+        self.scan(started)
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                while stop_after is None or time.monotonic() - started < stop_after:
+                    busy = self.settling or self.pending or self.in_flight
+                    # Wake often while files settle or convert, otherwise wait for the next event or poll
+                    timeout = min(0.5, self.settle_seconds) if busy else self.poll_interval
+                    events_complete = self.wait_for_events(inotify, timeout)
+                    now = time.monotonic()
+                    if not events_complete or now - last_scan >= scan_interval:
+                        self.scan(now)
+                        last_scan = now
+                    self.check_settled(now)
+                    self.reap()
+                    self.dispatch(executor)
+                    if now - last_metrics >= self.metrics_interval:
+                        self.publish_metrics()
+                        last_metrics = now
+                # Let running conversions finish before reporting
+                while self.in_flight:
+                    time.sleep(0.1)
+                    self.reap()
+        except KeyboardInterrupt:
+            logger.info("Watcher stopped")
+        finally:
+            if inotify is not None:
+                inotify.close()
+        self.publish_metrics()
+
+
+def _convert_with_processor(file_path, output_directory):
+    """Pool worker: convert one workbook with the arg_path_log engine"""
+    from arg_path_log import ExcelProcessor, flush_logging
+    try:
+        ExcelProcessor(file_path, output_directory).process_excel_file()
+    finally:
+        flush_logging()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a directory and convert new Excel files to A360 manifests.")
+    parser.add_argument("excel_directory", type=str, help="Directory to watch for .xlsx files")
+    parser.add_argument("output_directory", type=str, help="Directory to save manifest files")
+    parser.add_argument("--workers", type=int, default=2, help="Maximum concurrent conversions")
+    parser.add_argument("--settle-seconds", type=float, default=2.0,
+                        help="Seconds a file's size and mtime must stay unchanged before converting")
+    parser.add_argument("--poll-interval", type=float, default=5.0,
+                        help="Scan interval when inotify is unavailable")
+    parser.add_argument("--polling", action="store_true", help="Poll even if inotify is available")
+    parser.add_argument("--ready-marker", type=str, default=None,
+                        help="Convert a file only once <file><marker> exists (e.g. .done) instead of waiting for it to settle")
+    parser.add_argument("--metrics-file", type=str, default=None,
+                        help="Write queue depth and latency metrics to this JSON file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    os.makedirs(args.output_directory, exist_ok=True)
+    watcher = DirectoryWatcher(
+        args.excel_directory,
+        args.output_directory,
+        _convert_with_processor,
+        workers=args.workers,
+        settle_seconds=args.settle_seconds,
+        poll_interval=args.poll_interval,
+        metrics_file=args.metrics_file,
+        use_inotify=not args.polling,
+        ready_marker=args.ready_marker,
+    )
+    watcher.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+import os
+import json
+import shutil
+from datetime import datetime, date, time, timedelta
+from itertools import zip_longest
+from manifest_writer import write_atomic
+from columnar_reader import ColumnarSheet
+
+try:
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:
+    pa = None
+
+# Bump when the on-disk encoding changes; older entries are then never read and evicted first
+CACHE_FORMAT = 1
+
+# Cell kinds stored next to each column. Arrow columns hold one type, but a
+# worksheet column mixes strings, numbers, dates and blanks, so every cell
+# keeps its kind and its value in the matching typed column.
+EMPTY, STR, INT, FLOAT, BOOL, DATETIME, TIME, TIMEDELTA = range(8)
+EPOCH = datetime(1970, 1, 1)
+INT64_RANGE = range(-2 ** 63, 2 ** 63)
+
+
+class UncacheableValue(Exception):
+    """A cell value the Arrow encoding cannot round-trip exactly"""
+
+
+def _cell_kind(value):
+    """Kind code and int64 payload of one cell (payload None for str/float)"""
+    # bool before int and datetime before date: both are subclasses
+    if value is None:
+        return EMPTY, None
+    if isinstance(value, str):
+        return STR, None
+    if isinstance(value, bool):
+        return BOOL, int(value)
+    if isinstance(value, int):
+        if value not in INT64_RANGE:
+            raise UncacheableValue(value)
+        return INT, value
+    if isinstance(value, float):
+        return FLOAT, None
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            raise UncacheableValue(value)
+        return DATETIME, (value - EPOCH) // timedelta(microseconds=1)
+    if isinstance(value, time):
+        if value.tzinfo is not None:
+            raise UncacheableValue(value)
+        return TIME, ((value.hour * 60 + value.minute) * 60 + value.second) * 1000000 + value.microsecond
+    if isinstance(value, timedelta):
+        return TIMEDELTA, value // timedelta(microseconds=1)
+    if isinstance(value, date):
+        # openpyxl returns datetimes for date cells; a plain date would not round-trip
+        raise UncacheableValue(value)
+    if hasattr(value, 'item'):
+        # numpy scalars from the pandas reader
+        return _cell_kind(value.item())
+    raise UncacheableValue(value)
+
+
+def encode_column(values):
+    """Arrow arrays (kind, str, int64, float64) holding one worksheet column"""
+    kinds = []
+    strings = []
+    ints = []
+    floats = []
+    for value in values:
+        kind, payload = _cell_kind(value)
+        kinds.append(kind)
+        strings.append(value if kind == STR else None)
+        ints.append(payload)
+        floats.append(float(value) if kind == FLOAT else None)
+    return [
+        pa.array(kinds, type=pa.int8()),
+        pa.array(strings, type=pa.large_string()),
+        pa.array(ints, type=pa.int64()),
+        pa.array(floats, type=pa.float64()),
+    ]
+
+
+def decode_column(kinds, strings, ints, floats):
+    """Object array of Python cell values, the inverse of encode_column"""
+    kinds = kinds.to_numpy(zero_copy_only=False)
+    values = np.full(len(kinds), None, dtype=object)
+
+    mask = kinds == STR
+    if mask.any():
+        values[mask] = strings.to_numpy(zero_copy_only=False)[mask]
+    mask = kinds == FLOAT
+    if mask.any():
+        values[mask] = floats.to_numpy(zero_copy_only=False)[mask].tolist()
+
+    int_kinds = (kinds == INT) | (kinds == BOOL) | (kinds >= DATETIME)
+    if int_kinds.any():
+        payloads = ints.fill_null(0).to_numpy()
+        for kind, convert in (
+            (INT, None),
+            (BOOL, bool),
+            (DATETIME, lambda micros: EPOCH + timedelta(microseconds=micros)),
+            (TIME, lambda micros: (datetime.min + timedelta(microseconds=micros)).time()),
+            (TIMEDELTA, lambda micros: timedelta(microseconds=micros)),
+        ):
+            mask = kinds == kind
+            if mask.any():
+                column = payloads[mask].tolist()
+                values[mask] = column if convert is None else [convert(micros) for micros in column]
+    return values
+
+
+def sheet_columns(sheet):
+    """Every column of a worksheet (openpyxl or ColumnarSheet) as value sequences"""
+    if isinstance(sheet, ColumnarSheet):
+        return [sheet.frame.iloc[:, index].tolist() for index in range(sheet.frame.shape[1])]
+    rows = sheet.iter_rows(values_only=True)
+    return [list(column) for column in zip_longest(*rows)]
+
+
+def columns_to_table(columns):
+    arrays = []
+    names = []
+    for index, values in enumerate(columns):
+        arrays.extend(encode_column(values))
+        names.extend(f"{index}.{part}" for part in ('kind', 'str', 'int', 'float'))
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def table_to_sheet(table):
+    """Rebuild a ColumnarSheet from a cached table"""
+    columns = {}
+    for index in range(table.num_columns // 4):
+        arrays = [table.column(index * 4 + part).combine_chunks() for part in range(4)]
+        columns[index] = decode_column(*arrays)
+    return ColumnarSheet(pd.DataFrame(columns, dtype=object))
+
+
+class WorkbookCache:
+    """Arrow IPC copies of parsed worksheets, keyed by workbook digest.
+
+    Each workbook gets a directory holding sheets.json (sheet names in
+    order) and one <index>.arrow file per sheet read so far, written the
+    first time a conversion reads that sheet. Reads memory-map the file,
+    so a repeat conversion never touches the XLSX archive. Opening an
+    entry bumps the mtime of its sheets.json, and evict() deletes the
+    least recently used entries until the cache fits in max_bytes.
+    """
+
+    INDEX_FILE = 'sheets.json'
+
+    def __init__(self, directory, max_bytes):
+        if pa is None:
+            raise ImportError("The workbook cache requires the pyarrow package")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def entry_directory(self, key):
+        return os.path.join(self.directory, f"v{CACHE_FORMAT}-{key.replace(':', '-')}")
+
+    def open(self, key, source):
+        """CachedWorkbook for key; source() opens the real workbook on a miss"""
+        return CachedWorkbook(self.entry_directory(key), source)
+
+    def entries(self):
+        """(last used, size in bytes, path) of every cache entry"""
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if not entry.is_dir():
+                    continue
+                size = 0
+                for root, _, files in os.walk(entry.path):
+                    for name in files:
+                        try:
+                            size += os.path.getsize(os.path.join(root, name))
+                        except FileNotFoundError:
+                            pass
+                index_path = os.path.join(entry.path, self.INDEX_FILE)
+                last_used = os.path.getmtime(index_path) if os.path.exists(index_path) else 0.0
+                # Entries of an older format are never read again
+                if not entry.name.startswith(f"v{CACHE_FORMAT}-"):
+                    last_used = 0.0
+                entries.append((last_used, size, entry.path))
+        return entries
+
+    def evict(self, keep=None):
+        """Delete least recently used entries until the total fits; returns bytes freed"""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if keep is not None and os.path.abspath(path) == os.path.abspath(keep):
+                continue
+            # Readers that already mapped a file keep it until they close it
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            freed += size
+        return freed
+
+
+class CachedWorkbook:
+    """Workbook facade that serves sheets from a cache entry.
+
+    Sheets missing from the entry are read from the source workbook (opened
+    on first need), stored, and returned from the stored copy, so the
+    conversion sees the same values on every run.
+    """
+
+    def __init__(self, entry_directory, source):
+        self.entry_directory = entry_directory
+        self.source = source
+        self._workbook = None
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(entry_directory, exist_ok=True)
+        index_path = os.path.join(entry_directory, WorkbookCache.INDEX_FILE)
+        try:
+            with open(index_path, 'r') as f:
+                self.sheetnames = json.load(f)
+            os.utime(index_path)
+        except (FileNotFoundError, ValueError):
+            self.sheetnames = list(self.workbook.sheetnames)
+            write_atomic(index_path, json.dumps(self.sheetnames).encode('utf-8'))
+
+    @property
+    def workbook(self):
+        if self._workbook is None:
+            self._workbook = self.source()
+        return self._workbook
+
+    def sheet_path(self, sheet_name):
+        return os.path.join(self.entry_directory, f"{self.sheetnames.index(sheet_name)}.arrow")
+
+    def __getitem__(self, sheet_name):
+        path = self.sheet_path(sheet_name)
+        if os.path.exists(path):
+            self.hits += 1
+            with pa.memory_map(path, 'r') as source:
+                return table_to_sheet(pa.ipc.open_file(source).read_all())
+
+        self.misses += 1
+        columns = sheet_columns(self.workbook[sheet_name])
+        try:
+            table = columns_to_table(columns)
+        except UncacheableValue:
+            # Convert from the values read; the next run parses the sheet again
+            return ColumnarSheet(pd.DataFrame(dict(enumerate(columns)), dtype=object))
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        write_atomic(path, sink.getvalue().to_pybytes())
+        return table_to_sheet(table)
+
+    def close(self):
+        if self._workbook is not None and hasattr(self._workbook, 'close'):
+            self._workbook.close()